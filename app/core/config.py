@@ -6,6 +6,8 @@ from logging import INFO
 BASE_DIR = Path(__file__).parent.parent.parent
 DATA_DIR = BASE_DIR / "data"
 EXCEL_FILE = DATA_DIR / "sheet.xlsx"
+SNAPSHOT_FILE = DATA_DIR / "sheet.arrow"  # Typed columnar snapshot ingested from EXCEL_FILE
+ANALYTICS_EXCEL_FILE = DATA_DIR / "prod_source_scores_normalized.xlsx"
 
 # API Config
 API_TITLE = "AEO/GEO Dashboard API"
@@ -21,6 +23,58 @@ CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost
 
 # Caching
 CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "300"))
+# Background refresher reloads this many seconds before the TTL lapses
+CACHE_REFRESH_AHEAD_SECONDS = int(os.getenv("CACHE_REFRESH_AHEAD_SECONDS", "30"))
+BACKGROUND_REFRESH = os.getenv("BACKGROUND_REFRESH", "True") == "True"
+# After a failed reload, wait before the next attempt (stale data keeps being served):
+# LOAD_RETRY_BACKOFF_SECONDS, doubling per consecutive failure up to the max
+# (default: the cache TTL); reset by a successful load
+LOAD_RETRY_BACKOFF_SECONDS = float(os.getenv("LOAD_RETRY_BACKOFF_SECONDS", "5"))
+LOAD_RETRY_BACKOFF_MAX_SECONDS = float(os.getenv("LOAD_RETRY_BACKOFF_MAX_SECONDS", str(CACHE_TTL_SECONDS)))
+# Change-driven reloads: poll EXCEL_FILE / ANALYTICS_EXCEL_FILE and reload only
+# when their content changes (replaces TTL expiry and the background refresher)
+FILE_WATCH_ENABLED = os.getenv("FILE_WATCH_ENABLED", "True") == "True"
+FILE_WATCH_INTERVAL_SECONDS = float(os.getenv("FILE_WATCH_INTERVAL_SECONDS", "2"))
+# Multi-worker mode: memory-map the snapshot (shared page cache) and
+# pick up new generations written by any worker or by the ingest CLI
+SHARED_SNAPSHOT = os.getenv("SHARED_SNAPSHOT", "False") == "True"
+# Shared mode: how often a worker re-reads the on-disk generation (not every request)
+SNAPSHOT_RECHECK_SECONDS = float(os.getenv("SNAPSHOT_RECHECK_SECONDS", "1"))
+
+# Compute pool: heavy dashboard rendering runs off the event loop in a bounded
+# thread pool; requests beyond WORKERS running + QUEUE_DEPTH waiting get 503
+COMPUTE_POOL_ENABLED = os.getenv("COMPUTE_POOL_ENABLED", "True") == "True"
+COMPUTE_POOL_WORKERS = int(os.getenv("COMPUTE_POOL_WORKERS", "4"))
+COMPUTE_POOL_QUEUE_DEPTH = int(os.getenv("COMPUTE_POOL_QUEUE_DEPTH", "16"))
+COMPUTE_POOL_RETRY_AFTER_SECONDS = int(os.getenv("COMPUTE_POOL_RETRY_AFTER_SECONDS", "1"))
+
+# Response cache: rendered dashboard responses keyed by endpoint + canonical
+# params + data version (LRU, bounded by entry count and total body bytes)
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "True") == "True"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Server-Timing: per-stage durations (filters, NRS, heatmap, serialization...)
+# in a response header; off by default (spans are no-ops)
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "False") == "True"
+# Also add the render's stage timings to explore metadata.timings_ms (debugging)
+SERVER_TIMING_METADATA = os.getenv("SERVER_TIMING_METADATA", "False") == "True"
+
+# Profiling (admin): a request with an X-Profile header runs under cProfile
+# (.pstats dump in PROFILE_DIR) and /api/debug/profile/sample samples the
+# whole process. Off unless PROFILING_ENABLED=True *and* a non-empty
+# PROFILING_TOKEN is set (the header must carry it); enabled without a token
+# it stays off and a warning is logged at startup
+PROFILING_REQUESTED = os.getenv("PROFILING_ENABLED", "False") == "True"
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_ENABLED = PROFILING_REQUESTED and bool(PROFILING_TOKEN)
+PROFILE_DIR = BASE_DIR / "logs" / "profiles"
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))  # Oldest dumps are deleted
+PROFILE_MAX_SAMPLE_SECONDS = int(os.getenv("PROFILE_MAX_SAMPLE_SECONDS", "60"))
+
+# Explore cards
+EXPLORE_MAX_PAGE_SIZE = int(os.getenv("EXPLORE_MAX_PAGE_SIZE", "5000"))  # Upper bound for `limit`
+EXPLORE_STREAM_CHUNK_ROWS = int(os.getenv("EXPLORE_STREAM_CHUNK_ROWS", "1000"))  # Rows per NDJSON chunk
 
 # Data Constants
 MAX_RANK = 5
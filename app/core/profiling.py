@@ -0,0 +1,168 @@
+import cProfile
+import hmac
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, TypeVar
+from starlette.requests import Request
+from starlette.responses import Response
+from app.core.config import PROFILING_ENABLED, PROFILING_TOKEN, PROFILE_DIR, PROFILE_MAX_FILES
+from app.core.logger import logger
+
+T = TypeVar("T")
+
+# Request header that asks for a profile (value: PROFILING_TOKEN)
+PROFILE_HEADER = "x-profile"
+# The debug endpoints take the same header as their admin token; never profile them
+DEBUG_PATH_PREFIX = "/api/debug/"
+
+# cProfile segments of the request being profiled (event loop + compute pool
+# threads), merged when the response is ready. None outside a profiled request.
+_session: ContextVar[Optional[List[cProfile.Profile]]] = ContextVar("profile_session", default=None)
+
+# One profiled request and one sampler at a time: profilers hook the interpreter
+_request_lock = threading.Lock()
+_sampler_lock = threading.Lock()
+
+def authorized(header_value: Optional[str]) -> bool:
+    """Profiling is on and the header carries the admin token (never without one)."""
+    if not PROFILING_ENABLED or not PROFILING_TOKEN or header_value is None:
+        return False
+    return hmac.compare_digest(header_value.encode(), PROFILING_TOKEN.encode())
+
+def profiling_active() -> bool:
+    """True inside a profiled request (the response cache is bypassed so the render is captured)."""
+    return _session.get() is not None
+
+def run_profiled(fn: Callable[..., T], *args) -> T:
+    """
+    Run fn(*args), adding a profile of it to the current request's session.
+    cProfile is per-thread before Python 3.12; from 3.12 it is process-wide
+    and the request's profile already covers this thread (enable() refuses
+    a second profiler), so fn just runs.
+    """
+    profiles = _session.get()
+    if profiles is None:
+        return fn(*args)
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        return fn(*args)
+    try:
+        return fn(*args)
+    finally:
+        profile.disable()
+        profiles.append(profile)
+
+def _profile_name(request: Request, suffix: str) -> str:
+    path = re.sub(r"[^A-Za-z0-9_.-]+", "_", request.url.path.strip("/")) or "root"
+    return f"{datetime.now():%Y%m%d-%H%M%S-%f}-{request.method}-{path[:80]}{suffix}"
+
+def _prune_profiles():
+    """Keep the newest PROFILE_MAX_FILES dumps."""
+    files = sorted(list_profiles(), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in files[PROFILE_MAX_FILES:]:
+        old.unlink(missing_ok=True)
+
+def save_profile(name: str, write: Callable[[Path], None]) -> Path:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    path = PROFILE_DIR / name
+    write(path)
+    _prune_profiles()
+    return path
+
+def list_profiles() -> List[Path]:
+    if not PROFILE_DIR.exists():
+        return []
+    return [p for p in PROFILE_DIR.iterdir() if p.suffix in (".pstats", ".folded")]
+
+async def profile_request(request: Request, call_next) -> Response:
+    """
+    Middleware body: requests carrying an authorized X-Profile header run
+    under cProfile; the merged stats are written to PROFILE_DIR as .pstats
+    (snakeviz, `python -m pstats`, flameprof) and named in X-Profile-File.
+    The event-loop profile also sees other requests interleaved on the loop,
+    so profile on a quiet instance. Streaming bodies are profiled up to the
+    response headers.
+    """
+    if request.url.path.startswith(DEBUG_PATH_PREFIX) or not authorized(request.headers.get(PROFILE_HEADER)):
+        return await call_next(request)
+    if not _request_lock.acquire(blocking=False):
+        response = await call_next(request)
+        response.headers["X-Profile-Status"] = "busy"
+        return response
+
+    profiles: List[cProfile.Profile] = []
+    token = _session.set(profiles)
+    loop_profile = cProfile.Profile()
+    try:
+        loop_profile.enable()
+        try:
+            response = await call_next(request)
+        finally:
+            loop_profile.disable()
+    finally:
+        _session.reset(token)
+        _request_lock.release()
+
+    stats = pstats.Stats(loop_profile, *profiles)
+    path = save_profile(_profile_name(request, ".pstats"), stats.dump_stats)
+    logger.info(f"Profiled {request.method} {request.url.path} → {path}")
+    response.headers["X-Profile-File"] = path.name
+    response.headers["X-Profile-Status"] = "stored"
+    return response
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+def sample_stacks(seconds: float, interval_s: float) -> Counter:
+    """
+    Sample every thread's stack for `seconds`; folded stack (root first,
+    `thread;file:function;...`) → sample count. Blocking: run off the loop.
+    """
+    own_id = threading.get_ident()
+    thread_names = {}
+    counts: Counter = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            if thread_id not in thread_names:
+                thread_names = {t.ident: t.name for t in threading.enumerate()}
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(thread_names.get(thread_id, f"thread-{thread_id}"))
+            counts[";".join(reversed(stack))] += 1
+        time.sleep(interval_s)
+    return counts
+
+def sample_process(request: Request, seconds: float, interval_s: float) -> Optional[Path]:
+    """
+    Sample the whole process and store the folded stacks (flamegraph.pl,
+    speedscope, inferno) in PROFILE_DIR. None if a sample is already running.
+    """
+    if not _sampler_lock.acquire(blocking=False):
+        return None
+    try:
+        counts = sample_stacks(seconds, interval_s)
+    finally:
+        _sampler_lock.release()
+
+    def write(path: Path):
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in counts.most_common()))
+
+    path = save_profile(_profile_name(request, ".folded"), write)
+    logger.info(f"Sampled process for {seconds}s ({sum(counts.values())} stacks) → {path}")
+    return path
@@ -0,0 +1,200 @@
+import bisect
+import functools
+import math
+import numbers
+import os
+import threading
+import time
+from contextvars import ContextVar, Token
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+from starlette.requests import Request
+
+T = TypeVar("T")
+
+# Prometheus text exposition format
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4"  # Starlette appends "; charset=utf-8"
+
+# Request duration buckets (seconds): cache hits take ~ms, cold renders up to seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Route label for requests that matched no route (keeps label cardinality bounded)
+UNMATCHED_ROUTE = "unmatched"
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, numbers.Integral):  # Includes numpy ints
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+def format_sample(name: str, labels: Dict[str, str], value) -> str:
+    if labels:
+        label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+        return f"{name}{{{label_text}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+def metric_family(
+    name: str, kind: str, documentation: str, samples: Iterable[Tuple[Dict[str, str], Optional[float]]]
+) -> List[str]:
+    """HELP/TYPE header + one line per sample (samples with a None value are left out)."""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    lines.extend(format_sample(name, labels, value) for labels, value in samples if value is not None)
+    return lines
+
+class Histogram:
+    """Cumulative-bucket histogram per label combination (thread-safe)."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float] = DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values → per-bucket counts (non-cumulative), sum, count
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str):
+        index = bisect.bisect_left(self.buckets, value)  # First bucket with value <= bound
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            snapshot = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labelvalues, counts, total, count in sorted(snapshot):
+            labels = dict(zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                lines.append(format_sample(f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            lines.append(format_sample(f"{self.name}_sum", labels, total))
+            lines.append(format_sample(f"{self.name}_count", labels, count))
+        return lines
+
+class Gauge:
+    """Single-value gauge (thread-safe inc/dec)."""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: int = 1):
+        with self._lock:
+            self.value -= amount
+
+    def collect(self) -> List[str]:
+        return metric_family(self.name, "gauge", self.documentation, [({}, self.value)])
+
+request_duration = Histogram(
+    "aeo_http_request_duration_seconds",
+    "HTTP request duration (until response headers) by method, route template and status.",
+    ["method", "route", "status"],
+)
+requests_in_flight = Gauge("aeo_http_requests_in_flight", "HTTP requests currently being handled.")
+
+def route_template(request: Request) -> str:
+    """Matched route path ("/api/prompt/{prompt_id}"), not the raw URL."""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+def record_request(request: Request, status_code: int, duration_s: float):
+    request_duration.observe(duration_s, request.method, route_template(request), str(status_code))
+
+def process_resident_memory_bytes() -> Optional[int]:
+    """Current RSS from /proc (None where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+# ============ SERVER-TIMING SPANS ============
+# Per-request stage durations (ms), accumulated by name. None outside a timed
+# request, so spans cost one ContextVar lookup when timing is off. The compute
+# pool runs tasks in a copy of the caller's context, so spans inside renders
+# land in the same dict.
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("server_timings", default=None)
+
+def start_timings() -> Token:
+    return _timings.set({})
+
+def stop_timings(token: Token):
+    _timings.reset(token)
+
+def current_timings() -> Optional[Dict[str, float]]:
+    """Stage durations recorded so far in this request (rounded ms), None if not timed."""
+    timings = _timings.get()
+    if timings is None:
+        return None
+    return {name: round(ms, 2) for name, ms in timings.items()}
+
+def server_timing_header(total_s: float) -> str:
+    """Server-Timing value: one `name;dur=ms` entry per stage, plus the total."""
+    entries = [f"{name};dur={ms:.2f}" for name, ms in (_timings.get() or {}).items()]
+    entries.append(f"total;dur={total_s * 1000:.2f}")
+    return ", ".join(entries)
+
+class _Span:
+    __slots__ = ("timings", "name", "start")
+
+    def __init__(self, timings: Dict[str, float], name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        elapsed_ms = (time.perf_counter() - self.start) * 1000
+        self.timings[self.name] = self.timings.get(self.name, 0.0) + elapsed_ms
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+def span(name: str):
+    """`with span("stage"):` adds the block's duration to this request's timings."""
+    timings = _timings.get()
+    if timings is None:
+        return _NOOP_SPAN
+    return _Span(timings, name)
+
+def timed(name: Optional[str] = None) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator: every call is a span named `name` (default: the function name)."""
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            timings = _timings.get()
+            if timings is None:
+                return fn(*args, **kwargs)
+            with _Span(timings, label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
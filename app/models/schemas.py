@@ -84,6 +84,12 @@ class ComparisonResponse(BaseModel):
     win_lose_chips: List[WinLoseChip]
     metadata: Dict[str, Any]
 
+class BatchComparisonResponse(BaseModel):
+    product_name: str
+    source1: str
+    comparisons: List[ComparisonResponse]
+    metadata: Dict[str, Any]
+
 # ============ Prompt Detail ============
 class PromptCard(BaseModel):
     card_id: str
@@ -119,3 +125,7 @@ class HealthResponse(BaseModel):
     unique_prompts: int
     data_freshness: datetime
     data_quality: Dict[str, float]
+    extra_parse_failures: int = 0  # Rows whose `extra` value could not be parsed
+    reloads: Dict[str, Dict[str, Any]] = {}
+    response_cache: Dict[str, Any] = {}
+    compute_pool: Dict[str, Any] = {}
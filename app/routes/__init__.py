@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.routes import home, explore, compare, prompt_detail, health, analytics
+from app.routes import home, explore, compare, prompt_detail, health, analytics, debug
 
 router = APIRouter()
 
@@ -9,4 +9,5 @@ router.include_router(home.router)
 router.include_router(explore.router)
 router.include_router(compare.router)
 router.include_router(prompt_detail.router)
-router.include_router(analytics.router)
\ No newline at end of file
+router.include_router(analytics.router)
+router.include_router(debug.router)
\ No newline at end of file
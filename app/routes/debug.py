@@ -0,0 +1,57 @@
+import asyncio
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import FileResponse, PlainTextResponse
+from typing import Optional
+from app.core.config import PROFILING_ENABLED, PROFILE_MAX_SAMPLE_SECONDS
+from app.core.logger import logger
+from app.core.profiling import authorized, list_profiles, sample_process
+
+router = APIRouter(prefix="/debug", tags=["Debug"], include_in_schema=PROFILING_ENABLED)
+
+def _require_admin(x_profile: Optional[str]):
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not authorized(x_profile):
+        raise HTTPException(status_code=403, detail="Profiling token required (X-Profile header)")
+
+@router.get("/profile/sample", response_class=PlainTextResponse)
+async def sample_profile(
+    request: Request,
+    seconds: float = Query(10, gt=0, le=PROFILE_MAX_SAMPLE_SECONDS, description="Sampling duration"),
+    interval_ms: float = Query(5, ge=1, le=1000, description="Time between samples"),
+    x_profile: Optional[str] = Header(None),
+):
+    """
+    Sample every thread's stack for `seconds` and return folded stacks
+    (`thread;file:function;... count`, for flamegraph.pl / speedscope).
+    Also stored in PROFILE_DIR (named in X-Profile-File).
+    """
+    _require_admin(x_profile)
+    try:
+        # Default executor, not the compute pool: sampling must not take render capacity
+        path = await asyncio.to_thread(sample_process, request, seconds, interval_ms / 1000)
+        if path is None:
+            raise HTTPException(status_code=409, detail="A sample is already running")
+        return PlainTextResponse(path.read_text(), headers={"X-Profile-File": path.name})
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Profile sampling failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/profiles")
+async def get_profiles(x_profile: Optional[str] = Header(None)):
+    """Stored profiles (per-request .pstats and sampled .folded), newest first."""
+    _require_admin(x_profile)
+    files = sorted(list_profiles(), key=lambda p: p.stat().st_mtime, reverse=True)
+    return {"profiles": [{"name": p.name, "bytes": p.stat().st_size} for p in files]}
+
+@router.get("/profiles/{name}")
+async def download_profile(name: str, x_profile: Optional[str] = Header(None)):
+    """Download one stored profile."""
+    _require_admin(x_profile)
+    path = next((p for p in list_profiles() if p.name == name), None)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Profile '{name}' not found")
+    return FileResponse(path, filename=path.name)
@@ -1,84 +1,219 @@
-from fastapi import APIRouter, HTTPException, Query
+import pandas as pd
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from typing import Optional, List
 from datetime import datetime
 from app.models.schemas import (
-    ExploreDashboardResponse, HeatmapCell, ProductPerformanceRow, CardSummary
+    ExploreDashboardResponse, HeatmapCell, ProductPerformanceRow
 )
-from app.services.data_loader import get_data
-from app.services.filters import apply_filters, get_applied_filters
+from app.services.data_loader import get_data, get_filter_index, get_served_data
+from app.services.filters import apply_filters, get_applied_filters, normalize_list_param
+from app.services.compute_pool import run_in_pool
+from app.services.response_cache import cached_json_response
 from app.services.analysis import (
-    generate_heatmap_data, generate_product_performance, generate_card_summaries
+    generate_heatmap_data, generate_product_performance, serialize_card_summaries,
+    iter_card_summaries_ndjson, parse_card_fields, CARD_SUMMARY_FIELDS,
 )
 from app.services.metrics import calculate_nrs_per_row
+from app.core.config import EXPLORE_MAX_PAGE_SIZE, EXPLORE_STREAM_CHUNK_ROWS, SERVER_TIMING_METADATA
 from app.core.logger import logger
+from app.core.telemetry import current_timings, span
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.serialization import json_object_bytes
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
+FIELDS_DESCRIPTION = f"Comma-separated card fields to return ({', '.join(CARD_SUMMARY_FIELDS)}); all if omitted"
+
 @router.get("/explore", response_model=ExploreDashboardResponse)
 async def get_explore_dashboard(
+    request: Request,
     product: Optional[str] = Query(None, description="Comma-separated product names"),
     source: Optional[str] = Query(None, description="Comma-separated source names"),
     rank_min: int = Query(1, ge=1, le=5),
     rank_max: int = Query(5, ge=1, le=5),
     has_price: bool = Query(False),
     has_delivery: bool = Query(False),
+    limit: Optional[int] = Query(None, ge=1, le=EXPLORE_MAX_PAGE_SIZE, description="Cards per page (all if omitted)"),
+    cursor: Optional[str] = Query(None, description="metadata.next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
 ):
     """
     Filtered analysis: heatmap + product performance + cards.
+    Heatmap and product performance always cover every filtered row; `cards`
+    is paginated when `limit`/`cursor` is given (metadata.next_cursor is null
+    on the last page).
     """
     try:
-        df = get_data()
-        
-        # Apply filters
-        filtered_df = apply_filters(
-            df,
-            product=product,
-            source=source,
-            rank_min=rank_min,
-            rank_max=rank_max,
-            has_price=has_price,
-            has_delivery=has_delivery,
-        )
+        # Canonical list order: "a,b" and "b,a" share one cached response
+        product = normalize_list_param(product)
+        source = normalize_list_param(source)
+        # One read: the rendered page, its cursors and its cache key come from the same snapshot
+        df, generation, version = get_served_data()
         
-        if len(filtered_df) == 0:
-            logger.warning("No data after applying filters")
-            return ExploreDashboardResponse(
-                heatmap_data=[],
-                product_performance=[],
-                cards=[],
-                applied_filters=get_applied_filters(product, source, rank_min, rank_max, has_price, has_delivery),
-                metadata={"rows_returned": 0},
-            )
+        try:
+            card_fields = parse_card_fields(fields)
+            offset = decode_cursor(cursor, generation) if cursor else 0
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        paginated = limit is not None or cursor is not None
         
-        # Add NRS column
-        filtered_df = calculate_nrs_per_row(filtered_df)
-        
-        # Generate visualizations
-        heatmap_data = [HeatmapCell(**hm) for hm in generate_heatmap_data(filtered_df)]
-        product_perf = [
-            ProductPerformanceRow(**pp) for pp in generate_product_performance(filtered_df)
-        ]
-        cards = [CardSummary(**c) for c in generate_card_summaries(filtered_df)]
-        
-        # Metadata
-        metadata = {
-            "rows_returned": len(filtered_df),
-            "unique_products": filtered_df['product_name'].nunique(),
-            "unique_sources": filtered_df['source_normalized'].nunique(),
-            "unique_prompts": filtered_df['prompt_id'].nunique(),
+        params = {
+            "product": product, "source": source,
+            "rank_min": rank_min, "rank_max": rank_max,
+            "has_price": has_price, "has_delivery": has_delivery,
+            "fields": ",".join(card_fields),
+            "limit": limit, "offset": offset, "paginated": paginated,
         }
-        
-        response = ExploreDashboardResponse(
-            heatmap_data=heatmap_data,
-            product_performance=product_perf,
-            cards=cards,
-            applied_filters=get_applied_filters(product, source, rank_min, rank_max, has_price, has_delivery),
-            metadata=metadata,
+        return await cached_json_response(
+            request, "explore", params,
+            lambda: _render_explore(
+                product, source, rank_min, rank_max, has_price, has_delivery,
+                card_fields, limit, offset, paginated, df, generation,
+            ),
+            version=version,
         )
-        
-        logger.info(f"Explore dashboard generated with {len(filtered_df)} rows")
-        return response
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in explore dashboard: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+def _render_explore(
+    product: Optional[str],
+    source: Optional[str],
+    rank_min: int,
+    rank_max: int,
+    has_price: bool,
+    has_delivery: bool,
+    card_fields: List[str],
+    limit: Optional[int],
+    offset: int,
+    paginated: bool,
+    df: pd.DataFrame,
+    generation: int,
+) -> bytes:
+    """Explore response body (JSON bytes in the ExploreDashboardResponse shape)."""
+    
+    # Apply filters
+    filtered_df = apply_filters(
+        df,
+        product=product,
+        source=source,
+        rank_min=rank_min,
+        rank_max=rank_max,
+        has_price=has_price,
+        has_delivery=has_delivery,
+        index=get_filter_index(),
+    )
+    
+    applied_filters = get_applied_filters(product, source, rank_min, rank_max, has_price, has_delivery)
+    
+    if len(filtered_df) == 0:
+        logger.warning("No data after applying filters")
+        metadata = {"rows_returned": 0}
+        if paginated:
+            metadata.update({"cards_returned": 0, "next_cursor": None})
+        return json_object_bytes({
+            "heatmap_data": [],
+            "product_performance": [],
+            "cards": b"[]",
+            "applied_filters": applied_filters,
+            "metadata": metadata,
+        })
+    
+    # Add NRS column (relative to the filtered cards; with nothing filtered
+    # out the snapshot's load-time column is the same values)
+    if filtered_df is not df:
+        filtered_df = calculate_nrs_per_row(filtered_df)
+    
+    # Generate visualizations (small: validated through the models)
+    heatmap_rows = generate_heatmap_data(filtered_df)
+    performance_rows = generate_product_performance(filtered_df)
+    with span("validate"):
+        heatmap_data = [HeatmapCell(**hm) for hm in heatmap_rows]
+        product_perf = [ProductPerformanceRow(**pp) for pp in performance_rows]
+    
+    # Cards scale with the filtered rows: only the requested page is
+    # encoded, column-wise straight to JSON
+    end = offset + limit if limit is not None else len(filtered_df)
+    page = filtered_df.iloc[offset:end]
+    cards = serialize_card_summaries(page, card_fields)
+    
+    # Metadata
+    metadata = {
+        "rows_returned": len(filtered_df),
+        "unique_products": filtered_df['product_name'].nunique(),
+        "unique_sources": filtered_df['source_normalized'].nunique(),
+        "unique_prompts": filtered_df['prompt_id'].nunique(),
+    }
+    if paginated:
+        metadata["cards_returned"] = len(page)
+        metadata["next_cursor"] = (
+            encode_cursor(end, generation) if end < len(filtered_df) else None
+        )
+    
+    if SERVER_TIMING_METADATA:
+        # Stages of the render that built this body (cached along with it)
+        metadata["timings_ms"] = current_timings()
+    
+    logger.info(f"Explore dashboard generated with {len(filtered_df)} rows ({len(page)} cards)")
+    
+    # Same shape as ExploreDashboardResponse, assembled from pre-encoded parts
+    with span("serialize"):
+        return json_object_bytes({
+            "heatmap_data": heatmap_data,
+            "product_performance": product_perf,
+            "cards": cards,
+            "applied_filters": applied_filters,
+            "metadata": metadata,
+        })
+
+@router.get("/explore/cards")
+async def stream_explore_cards(
+    product: Optional[str] = Query(None, description="Comma-separated product names"),
+    source: Optional[str] = Query(None, description="Comma-separated source names"),
+    rank_min: int = Query(1, ge=1, le=5),
+    rank_max: int = Query(5, ge=1, le=5),
+    has_price: bool = Query(False),
+    has_delivery: bool = Query(False),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    """
+    Filtered cards as NDJSON (one CardSummary per line), streamed in chunks
+    so the full list is never materialized.
+    """
+    try:
+        try:
+            card_fields = parse_card_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        # Filtering scales with the snapshot: compute pool, not the event loop
+        # (the chunks below are encoded in Starlette's threadpool as they stream)
+        df = get_data()
+        filtered_df = await run_in_pool(
+            lambda: apply_filters(
+                df,
+                product=product,
+                source=source,
+                rank_min=rank_min,
+                rank_max=rank_max,
+                has_price=has_price,
+                has_delivery=has_delivery,
+                index=get_filter_index(),
+            )
+        )
+        
+        logger.info(f"Streaming {len(filtered_df)} explore cards")
+        return StreamingResponse(
+            iter_card_summaries_ndjson(filtered_df, card_fields, EXPLORE_STREAM_CHUNK_ROWS),
+            media_type="application/x-ndjson",
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error streaming explore cards: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,7 +1,11 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
 from datetime import datetime
 from app.models.schemas import HealthResponse
-from app.services.data_loader import get_data, get_stats
+from app.services.data_loader import get_data, get_stats, cache
+from app.services.analytics import analytics_cache
+from app.services.response_cache import response_cache, single_flight
+from app.services.compute_pool import compute_pool
 from app.core.logger import logger
 
 router = APIRouter(tags=["Health"])
@@ -30,8 +34,15 @@ async def health_check():
             data_loaded=True,
             total_rows=stats.get("total_rows", 0),
             unique_prompts=stats.get("unique_prompts", 0),
-            data_freshness=datetime.now(),
+            data_freshness=cache.loaded_at or datetime.now(),
             data_quality=data_quality,
+            extra_parse_failures=stats.get("extra_parse_failures", 0),
+            reloads={
+                "sheet": {**cache.load_stats.as_dict(), "generation": cache.generation},
+                "analytics": analytics_cache.load_stats.as_dict(),
+            },
+            response_cache={**response_cache.stats(), **single_flight.stats()},
+            compute_pool=compute_pool.stats(),
         )
         
         logger.info("Health check passed")
@@ -47,8 +58,12 @@ async def reload_cache():
     Force reload data cache.
     """
     try:
-        from services.data_loader import reload_data
-        reload_data()
+        from app.services.data_loader import reload_data
+        from app.services.analytics import reload_analytics
+        # Ingest + load block for seconds: off the loop, and on the default
+        # executor so a reload never takes (or is rejected by) render capacity
+        await asyncio.to_thread(reload_data)
+        await asyncio.to_thread(reload_analytics)
         logger.info("Cache reloaded")
         return {"status": "reloaded", "timestamp": datetime.now().isoformat()}
     except Exception as e:
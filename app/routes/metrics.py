@@ -0,0 +1,89 @@
+from fastapi import APIRouter, HTTPException, Response
+from app.core.logger import logger
+from app.core.telemetry import (
+    METRICS_CONTENT_TYPE, format_sample, metric_family, process_resident_memory_bytes,
+    request_duration, requests_in_flight,
+)
+from app.services.analytics import analytics_cache
+from app.services.compute_pool import compute_pool
+from app.services.data_loader import cache
+from app.services.response_cache import response_cache, single_flight
+
+router = APIRouter(tags=["Metrics"])
+
+def _load_metrics() -> list:
+    """Load counts and durations for the sheet and analytics caches."""
+    loads = {"sheet": cache.load_stats, "analytics": analytics_cache.load_stats}
+    lines = []
+    lines += metric_family("aeo_data_loads_total", "counter", "Successful cache loads.",
+                           [({"cache": name}, s.count) for name, s in loads.items()])
+    lines += metric_family("aeo_data_load_failures_total", "counter", "Failed cache loads.",
+                           [({"cache": name}, s.failures) for name, s in loads.items()])
+    lines += [
+        "# HELP aeo_data_load_duration_seconds Cache load duration.",
+        "# TYPE aeo_data_load_duration_seconds summary",
+    ]
+    for name, s in loads.items():
+        lines.append(format_sample("aeo_data_load_duration_seconds_sum", {"cache": name}, s.total_duration_ms / 1000))
+        lines.append(format_sample("aeo_data_load_duration_seconds_count", {"cache": name}, s.count))
+    lines += metric_family("aeo_data_last_load_duration_seconds", "gauge", "Duration of the most recent load.",
+                           [({"cache": name}, s.last_duration_ms / 1000 if s.last_duration_ms is not None else None)
+                            for name, s in loads.items()])
+    return lines
+
+def _snapshot_metrics() -> list:
+    """Size of the snapshot currently served."""
+    stats = cache.stats
+    return (
+        metric_family("aeo_snapshot_generation", "gauge", "Snapshot generation served.", [({}, cache.generation)])
+        + metric_family("aeo_snapshot_rows", "gauge", "Rows in the served snapshot.", [({}, stats.get("total_rows"))])
+        + metric_family("aeo_snapshot_prompts", "gauge", "Prompts in the served snapshot.", [({}, stats.get("unique_prompts"))])
+        + metric_family("aeo_snapshot_memory_bytes", "gauge", "In-memory size of the served frame (deep).",
+                        [({}, stats.get("memory_bytes"))])
+        + metric_family("aeo_process_resident_memory_bytes", "gauge", "Resident memory of this worker.",
+                        [({}, process_resident_memory_bytes())])
+    )
+
+def _cache_and_pool_metrics() -> list:
+    """Response cache, single-flight and compute pool counters."""
+    rc = response_cache.stats()
+    sf = single_flight.stats()
+    pool = compute_pool.stats()
+    return (
+        metric_family("aeo_response_cache_requests_total", "counter", "Response cache lookups by result.",
+                      [({"result": "hit"}, rc["hits"]), ({"result": "miss"}, rc["misses"])])
+        + metric_family("aeo_response_cache_hit_ratio", "gauge", "Hits / lookups since start.", [({}, rc["hit_ratio"])])
+        + metric_family("aeo_response_cache_evictions_total", "counter", "Entries evicted by the LRU bounds.",
+                        [({}, rc["evictions"])])
+        + metric_family("aeo_response_cache_entries", "gauge", "Cached responses.", [({}, rc["entries"])])
+        + metric_family("aeo_response_cache_bytes", "gauge", "Total cached body bytes.", [({}, rc["bytes"])])
+        + metric_family("aeo_single_flight_renders_total", "counter", "Cache-miss renders by role (leader ran it, coalesced waited).",
+                        [({"role": "leader"}, sf["leaders"]), ({"role": "coalesced"}, sf["coalesced"])])
+        + metric_family("aeo_single_flight_in_flight", "gauge", "Renders currently in flight.", [({}, sf["in_flight"])])
+        + metric_family("aeo_compute_pool_pending", "gauge", "Renders running or queued in the compute pool.",
+                        [({}, pool["pending"])])
+        + metric_family("aeo_compute_pool_capacity", "gauge", "Compute pool workers + queue depth.", [({}, pool["capacity"])])
+        + metric_family("aeo_compute_pool_tasks_total", "counter", "Compute pool tasks by result.",
+                        [({"result": "completed"}, pool["completed"]), ({"result": "rejected"}, pool["rejected"])])
+    )
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus metrics: request latency histograms (route template × status),
+    in-flight requests, cache loads, snapshot size and cache/pool counters.
+    Reads current state only; never triggers a data load.
+    """
+    try:
+        lines = (
+            request_duration.collect()
+            + requests_in_flight.collect()
+            + _load_metrics()
+            + _snapshot_metrics()
+            + _cache_and_pool_metrics()
+        )
+        return Response(content="\n".join(lines) + "\n", media_type=METRICS_CONTENT_TYPE)
+
+    except Exception as e:
+        logger.error(f"Metrics collection failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,46 +1,35 @@
 import pandas as pd
-from typing import List, Dict
-from app.utils.helpers import calculate_nrs
+from typing import Dict, Iterator, List, Optional
+from app.core.config import INVALID_CURRENCY
+from app.core.telemetry import timed
+from app.services.metrics import calculate_nrs_per_row
 
+@timed()
 def generate_heatmap_data(df: pd.DataFrame) -> List[Dict]:
-    """Product × Source heatmap with avg NRS."""
-    
-    heatmap = []
+    """Product × Source heatmap with avg NRS (one grouped aggregation)."""
     
     # Add NRS if not exists
     if 'nrs' not in df.columns:
-        df = df.copy()
-        def compute_nrs(group):
-            max_rank = group['rank'].max()
-            group['nrs'] = group['rank'].apply(lambda r: calculate_nrs(r, max_rank))
-            return group
-        df = df.groupby('prompt_id', group_keys=False).apply(compute_nrs)
+        df = calculate_nrs_per_row(df)
     
-    for product in sorted(df['product_name'].unique()):
-        for source in sorted(df['source_normalized'].unique()):
-            subset = df[(df['product_name'] == product) & (df['source_normalized'] == source)]
-            
-            if len(subset) > 0:
-                avg_nrs = round(subset['nrs'].mean(), 2)
-                heatmap.append({
-                    "product": product,
-                    "source": source,
-                    "avg_nrs": avg_nrs,
-                    "card_count": len(subset),
-                })
+    # Only observed (product, source) pairs, sorted by product then source
+    cells = (
+        df.groupby(['product_name', 'source_normalized'], sort=True, observed=True)['nrs']
+        .agg(avg_nrs='mean', card_count='size')
+        .reset_index()
+    )
+    cells['avg_nrs'] = cells['avg_nrs'].round(2)
     
-    return heatmap
+    return cells.rename(
+        columns={'product_name': 'product', 'source_normalized': 'source'}
+    ).to_dict(orient='records')
 
+@timed()
 def generate_product_performance(df: pd.DataFrame) -> List[Dict]:
     """Product performance table."""
     
     if 'nrs' not in df.columns:
-        df = df.copy()
-        def compute_nrs(group):
-            max_rank = group['rank'].max()
-            group['nrs'] = group['rank'].apply(lambda r: calculate_nrs(r, max_rank))
-            return group
-        df = df.groupby('prompt_id', group_keys=False).apply(compute_nrs)
+        df = calculate_nrs_per_row(df)
     
     performance = []
     
@@ -79,20 +68,64 @@ def generate_product_performance(df: pd.DataFrame) -> List[Dict]:
     
     return sorted(performance, key=lambda x: x['avg_rank'])
 
+# CardSummary fields, in response order
+CARD_SUMMARY_FIELDS = [
+    "card_id", "product_name", "rank", "source",
+    "price", "currency", "delivery_days", "delivery_fee",
+]
+
+# One vectorized builder per field (sentinel values masked to null)
+CARD_SUMMARY_COLUMNS = {
+    "card_id": lambda df: df['card_id'],
+    "product_name": lambda df: df['product_name'],
+    "rank": lambda df: df['rank'].astype('int64'),
+    "source": lambda df: df['source_normalized'],
+    "price": lambda df: df['price'].where(df['price'] > 0).astype(float),
+    "currency": lambda df: df['price_currency'].where(df['price_currency'] != INVALID_CURRENCY),
+    "delivery_days": lambda df: df['delivery_days'].astype('Int64').where(df['delivery_days'] >= 0),
+    "delivery_fee": lambda df: df['delivery_fee'].where(df['delivery_fee'] > 0).astype(float),
+}
+
+def parse_card_fields(fields: Optional[str]) -> List[str]:
+    """`fields=` projection (comma-separated) → CardSummary fields in response order."""
+    requested = {f.strip() for f in (fields or "").split(",") if f.strip()}
+    if not requested:
+        return CARD_SUMMARY_FIELDS
+    
+    unknown = sorted(requested.difference(CARD_SUMMARY_FIELDS))
+    if unknown:
+        raise ValueError(
+            f"Unknown card fields: {', '.join(unknown)} "
+            f"(available: {', '.join(CARD_SUMMARY_FIELDS)})"
+        )
+    return [f for f in CARD_SUMMARY_FIELDS if f in requested]
+
+def card_summary_frame(df: pd.DataFrame, fields: List[str] = CARD_SUMMARY_FIELDS) -> pd.DataFrame:
+    """Card summary columns (only the requested fields), built column-wise."""
+    return pd.DataFrame({field: CARD_SUMMARY_COLUMNS[field](df) for field in fields})
+
+@timed()
 def generate_card_summaries(df: pd.DataFrame) -> List[Dict]:
     """Convert rows to card summaries."""
     
-    cards = []
-    for _, row in df.iterrows():
-        cards.append({
-            "card_id": row['card_id'],
-            "product_name": row['product_name'],
-            "rank": int(row['rank']),
-            "source": row['source_normalized'],
-            "price": float(row['price']) if row['price'] > 0 else None,
-            "currency": row['price_currency'] if row['price_currency'] != '-1' else None,
-            "delivery_days": int(row['delivery_days']) if row['delivery_days'] >= 0 else None,
-            "delivery_fee": float(row['delivery_fee']) if row['delivery_fee'] > 0 else None,
-        })
-    
-    return cards
+    cards = card_summary_frame(df).astype(object)
+    return cards.where(cards.notna(), None).to_dict(orient="records")
+
+@timed()
+def serialize_card_summaries(df: pd.DataFrame, fields: List[str] = CARD_SUMMARY_FIELDS) -> bytes:
+    """
+    Card summaries straight to a JSON array (bytes): one columnar encode,
+    no per-row dicts or models. Same fields as CardSummary; floats are written
+    with 10 decimals, exact for prices and fees.
+    """
+    if len(df) == 0:
+        return b"[]"
+    return card_summary_frame(df, fields).to_json(orient="records", force_ascii=False).encode()
+
+def iter_card_summaries_ndjson(
+    df: pd.DataFrame, fields: List[str] = CARD_SUMMARY_FIELDS, chunk_rows: int = 1000
+) -> Iterator[bytes]:
+    """Card summaries as NDJSON, encoded `chunk_rows` at a time (one card per line)."""
+    for start in range(0, len(df), chunk_rows):
+        chunk = card_summary_frame(df.iloc[start:start + chunk_rows], fields)
+        yield chunk.to_json(orient="records", lines=True, force_ascii=False).encode()
@@ -1,38 +1,144 @@
+import threading
+import time
 import pandas as pd
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from app.core.config import ANALYTICS_EXCEL_FILE, CACHE_TTL_SECONDS, FILE_WATCH_ENABLED
 from app.core.logger import logger
+from app.services.data_loader import LoadStats
 
-# EXCEL_PATH = "/home/mohit/Desktop/asvaai/amazon/backend/data/prod_source_scores_normalized.xlsx"
-EXCEL_PATH = ".prod_source_scores_normalized.xlsx"
 
+class AnalyticsCache:
+    """In-memory cache for the source-score workbook, indexed by Product."""
 
-def get_category_winners():
+    def __init__(self):
+        self.df: Optional[pd.DataFrame] = None
+        self.loaded_at: Optional[datetime] = None
+        self.file_mtime: Optional[float] = None
+        self.heatmap: List[Dict] = []
+        self.marketshare: Dict[str, List[Dict]] = {}
+        # Single-flight guard: at most one workbook read runs at a time
+        self.load_lock = threading.Lock()
+        self.load_stats = LoadStats()
+
+    def is_expired(self) -> bool:
+        """Check if cache expired (TTL lapsed or workbook modified; watcher-driven if enabled)."""
+        if not self.loaded_at:
+            return True
+        if FILE_WATCH_ENABLED:
+            return False
+        if datetime.now() - self.loaded_at > timedelta(seconds=CACHE_TTL_SECONDS):
+            return True
+        try:
+            return ANALYTICS_EXCEL_FILE.stat().st_mtime != self.file_mtime
+        except OSError:
+            return False
+
+    def clear(self):
+        """Clear cache."""
+        self.df = None
+        self.loaded_at = None
+        self.file_mtime = None
+        self.heatmap = []
+        self.marketshare = {}
+
+analytics_cache = AnalyticsCache()
+
+
+def _load_into_cache() -> AnalyticsCache:
+    """Read the workbook and swap the views into the cache. Caller holds analytics_cache.load_lock."""
+
+    logger.info(f"Loading analytics Excel from {ANALYTICS_EXCEL_FILE}")
+
+    start = time.perf_counter()
     try:
-        df = pd.read_excel(EXCEL_PATH)
-        logger.info(f"Loaded Excel data with {len(df)} rows")
-        
-        # Drop rows with missing critical columns
-        df = df.dropna(subset=["Product", "source_normalized", "score_norm"])
-        
-        # Compute rank of marketplaces by normalized score within each product category (1 = highest)
-        df["rank"] = df.groupby("Product")["score_norm"].rank(method="dense", ascending=False)
-        
-        # Aggregate normalized scores per marketplace for overall "top 10" selection
-        marketplace_totals = (
-            df.groupby("source_normalized")["score_norm"].sum().reset_index().sort_values("score_norm", ascending=False)
+        file_mtime = ANALYTICS_EXCEL_FILE.stat().st_mtime
+        df = pd.read_excel(ANALYTICS_EXCEL_FILE)
+        heatmap = build_category_winners(df)
+        marketshare = build_marketplace_score_sums(df)
+
+        # Swap: both views are built before any of them changes
+        analytics_cache.heatmap = heatmap
+        analytics_cache.marketshare = marketshare
+        analytics_cache.df = df
+        analytics_cache.file_mtime = file_mtime
+        analytics_cache.loaded_at = datetime.now()
+        analytics_cache.load_stats.record(time.perf_counter() - start)
+
+        logger.info(
+            f"Loaded analytics Excel data with {len(df)} rows | "
+            f"{len(marketshare)} products indexed"
         )
-        top_10_marketplaces = marketplace_totals.head(10)["source_normalized"].tolist()
-        
-        # Filter df to keep only rows for top 10 marketplaces
-        df = df[df["source_normalized"].isin(top_10_marketplaces)].copy()
-        
-        # Flags for heatmap
-        df["is_rank1"] = df["rank"] == 1
-        df["is_amazon"] = df["source_normalized"].str.lower() == "amazon"
-        
-        heatmap = df[["Product", "source_normalized", "score_norm", "rank", "is_rank1", "is_amazon"]]
-        
+        return analytics_cache
+
+    except Exception as e:
+        analytics_cache.load_stats.record(time.perf_counter() - start, ok=False)
+        logger.error(f"Error loading analytics Excel: {e}")
+        raise
+
+
+def load_analytics() -> AnalyticsCache:
+    """Load source-score workbook once and precompute per-product views."""
+
+    if analytics_cache.df is not None and not analytics_cache.is_expired():
+        return analytics_cache
+
+    with analytics_cache.load_lock:
+        # A concurrent caller may have loaded while we waited
+        if analytics_cache.df is not None and not analytics_cache.is_expired():
+            return analytics_cache
+        return _load_into_cache()
+
+
+def build_category_winners(df: pd.DataFrame) -> List[Dict]:
+    """Heatmap rows: marketplace rank within each product, top 10 marketplaces."""
+
+    # Drop rows with missing critical columns
+    df = df.dropna(subset=["Product", "source_normalized", "score_norm"]).copy()
+
+    # Compute rank of marketplaces by normalized score within each product category (1 = highest)
+    df["rank"] = df.groupby("Product")["score_norm"].rank(method="dense", ascending=False)
+
+    # Aggregate normalized scores per marketplace for overall "top 10" selection
+    marketplace_totals = (
+        df.groupby("source_normalized")["score_norm"].sum().reset_index().sort_values("score_norm", ascending=False)
+    )
+    top_10_marketplaces = marketplace_totals.head(10)["source_normalized"].tolist()
+
+    # Filter df to keep only rows for top 10 marketplaces
+    df = df[df["source_normalized"].isin(top_10_marketplaces)].copy()
+
+    # Flags for heatmap
+    df["is_rank1"] = df["rank"] == 1
+    df["is_amazon"] = df["source_normalized"].str.lower() == "amazon"
+
+    heatmap = df[["Product", "source_normalized", "score_norm", "rank", "is_rank1", "is_amazon"]]
+    return heatmap.to_dict(orient="records")
+
+
+def build_marketplace_score_sums(df: pd.DataFrame) -> Dict[str, List[Dict]]:
+    """Per-product marketplace score sums, sorted descending (pie/donut data)."""
+
+    valid = df.dropna(subset=["Product", "source_normalized", "score_sum"])
+
+    # Aggregate score_sum by product + marketplace in one pass
+    agg = valid.groupby(["Product", "source_normalized"])["score_sum"].sum().reset_index()
+
+    # Mark if marketplace is amazon
+    agg["is_amazon"] = agg["source_normalized"].str.lower() == "amazon"
+
+    # Sort each product descending by score_sum
+    return {
+        product: group.drop(columns="Product").sort_values("score_sum", ascending=False).to_dict(orient="records")
+        for product, group in agg.groupby("Product", sort=False)
+    }
+
+
+def get_category_winners():
+    """Heatmap data for analytics dashboard (served from cache)."""
+    try:
         return {
-            "heatmap": heatmap.to_dict(orient="records")
+            "heatmap": load_analytics().heatmap
         }
     except Exception as e:
         logger.error(f"Error processing analytics excel: {e}")
@@ -40,24 +146,15 @@ def get_category_winners():
 
 
 def get_marketplace_score_sum(product: str):
+    """Marketplace score sums for a product category (dictionary lookup)."""
     try:
-        df = pd.read_excel(EXCEL_PATH)
-        logger.info(f"Loaded Excel data with {len(df)} rows")
-
-        # Filter rows for the given product category
-        product_df = df[df["Product"] == product].dropna(subset=["source_normalized", "score_sum"])
-
-        # Aggregate score_sum by marketplace
-        agg = product_df.groupby("source_normalized")["score_sum"].sum().reset_index()
-
-        # Sort descending by score_sum
-        sorted_agg = agg.sort_values("score_sum", ascending=False)
-
-        # Mark if marketplace is amazon
-        sorted_agg["is_amazon"] = sorted_agg["source_normalized"].str.lower() == "amazon"
-
-        # Prepare JSON friendly data
-        return sorted_agg.to_dict(orient="records")
+        return load_analytics().marketshare.get(product, [])
     except Exception as e:
         logger.error(f"Error loading marketplace score sums for product '{product}': {e}")
         raise e
+
+
+def reload_analytics() -> AnalyticsCache:
+    """Force reload analytics cache (waits for a load already in flight, then reads again)."""
+    with analytics_cache.load_lock:
+        return _load_into_cache()
@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional
+from app.models.schemas import ComparisonMetric, ComparisonResponse, WinLoseChip
+from app.utils.helpers import round_to_decimals
+
+# Aggregates for a (product, source) pair with no cards
+EMPTY_SOURCE_STATS = {
+    "cards": 0,
+    "mean_rank": None,
+    "mean_price": None,
+    "price_count": 0,
+    "mean_delivery": None,
+    "delivery_count": 0,
+}
+
+def source_key(source: str) -> str:
+    """Case-insensitive source key ("Flipkart" and "flipkart" are one source)."""
+    return source.lower()
+
+class CompareIndex:
+    """
+    product → source → card count, mean rank, mean valid price (> 0),
+    mean valid delivery days (>= 0) and valid-value counts.
+    Sources are keyed case-insensitively (source_key) and listed under their
+    first stored name, in first-appearance order within the product (the
+    order compare auto-detects source2 from). Built once per snapshot load.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        price = df['price'].to_numpy()
+        delivery_days = df['delivery_days'].to_numpy()
+
+        # Invalid values become NaN: mean/count skip them, so one grouped pass
+        # covers every mask the comparison needs
+        frame = pd.DataFrame({
+            "product": df['product_name'].to_numpy(),
+            "source": df['source_normalized'].astype(str).str.lower().to_numpy(),
+            "name": df['source_normalized'].astype(str).to_numpy(),
+            "rank": df['rank'].to_numpy(),
+            "price": np.where(price > 0, price, np.nan),
+            "delivery": np.where(delivery_days >= 0, delivery_days, np.nan),
+        })
+        agg = frame.groupby(["product", "source"], sort=False, observed=True).agg(
+            name=("name", "first"),
+            cards=("rank", "size"),
+            mean_rank=("rank", "mean"),
+            mean_price=("price", "mean"),
+            price_count=("price", "count"),
+            mean_delivery=("delivery", "mean"),
+            delivery_count=("delivery", "count"),
+        )
+
+        self.products: Dict[str, Dict[str, Dict]] = {}
+        # product → source key → stored source name (what responses show)
+        self.names: Dict[str, Dict[str, str]] = {}
+        for (product, source), name, cards, mean_rank, mean_price, price_count, mean_delivery, delivery_count in zip(
+            agg.index.tolist(),
+            agg['name'].tolist(),
+            agg['cards'].tolist(),
+            agg['mean_rank'].tolist(),
+            agg['mean_price'].tolist(),
+            agg['price_count'].tolist(),
+            agg['mean_delivery'].tolist(),
+            agg['delivery_count'].tolist(),
+        ):
+            self.products.setdefault(product, {})[source] = {
+                "cards": cards,
+                "mean_rank": mean_rank,
+                "mean_price": mean_price if price_count > 0 else None,
+                "price_count": price_count,
+                "mean_delivery": mean_delivery if delivery_count > 0 else None,
+                "delivery_count": delivery_count,
+            }
+            self.names.setdefault(product, {})[source] = name
+
+    def has_product(self, product: str) -> bool:
+        return product in self.products
+
+    def sources(self, product: str) -> List[str]:
+        """Stored names of the sources with cards for the product, in first-appearance order."""
+        return list(self.names.get(product, {}).values())
+
+    def get(self, product: str, source: str) -> Dict:
+        """Aggregates for one (product, source) pair, any case (EMPTY_SOURCE_STATS if no cards)."""
+        return self.products.get(product, {}).get(source_key(source), EMPTY_SOURCE_STATS)
+
+    def auto_source(self, product: str, exclude: str) -> Optional[str]:
+        """First source for the product other than `exclude`, any case (None if there is none)."""
+        return next((s for s in self.sources(product) if source_key(s) != source_key(exclude)), None)
+
+def build_comparison(product_name: str, source1: str, source2: str, s1: Dict, s2: Dict) -> ComparisonResponse:
+    """Head-to-head metrics + win chips from two (product, source) aggregates."""
+    
+    # Calculate metrics
+    metrics = []
+    
+    # Avg Price
+    s1_price = s1['mean_price']
+    s2_price = s2['mean_price']
+    
+    if s1_price and s2_price:
+        gap = s2_price - s1_price
+        gap_pct = round_to_decimals((gap / s1_price) * 100)
+        winner = "source1" if s1_price < s2_price else ("source2" if s2_price < s1_price else "tie")
+        metrics.append(ComparisonMetric(
+            metric="Average Price",
+            source1_value=round_to_decimals(s1_price),
+            source2_value=round_to_decimals(s2_price),
+            gap=round_to_decimals(gap),
+            gap_pct=gap_pct,
+            winner=winner,
+        ))
+    
+    # Avg Rank
+    s1_rank = s1['mean_rank'] if s1['cards'] > 0 else 999
+    s2_rank = s2['mean_rank'] if s2['cards'] > 0 else 999
+    gap = s2_rank - s1_rank
+    winner = "source1" if s1_rank < s2_rank else ("source2" if s2_rank < s1_rank else "tie")
+    metrics.append(ComparisonMetric(
+        metric="Average Rank",
+        source1_value=round_to_decimals(s1_rank),
+        source2_value=round_to_decimals(s2_rank),
+        gap=round_to_decimals(gap),
+        gap_pct=0.0,
+        winner=winner,
+    ))
+    
+    # Avg Delivery Days
+    s1_delivery = s1['mean_delivery']
+    s2_delivery = s2['mean_delivery']
+    
+    if s1_delivery and s2_delivery:
+        gap = s2_delivery - s1_delivery
+        winner = "source1" if s1_delivery < s2_delivery else ("source2" if s2_delivery < s1_delivery else "tie")
+        metrics.append(ComparisonMetric(
+            metric="Average Delivery Days",
+            source1_value=round_to_decimals(s1_delivery),
+            source2_value=round_to_decimals(s2_delivery),
+            gap=round_to_decimals(gap),
+            gap_pct=0.0,
+            winner=winner,
+        ))
+    
+    # Card Frequency
+    s1_freq = s1['cards']
+    s2_freq = s2['cards']
+    winner = "source1" if s1_freq > s2_freq else ("source2" if s2_freq > s1_freq else "tie")
+    metrics.append(ComparisonMetric(
+        metric="Appearances",
+        source1_value=float(s1_freq),
+        source2_value=float(s2_freq),
+        gap=float(s2_freq - s1_freq),
+        gap_pct=0.0,
+        winner=winner,
+    ))
+    
+    # Win/Lose Chips
+    chips = []
+    for metric in metrics:
+        if metric.winner == "source1":
+            if metric.metric == "Average Price":
+                value = f"-{abs(metric.gap_pct):.0f}%"
+                factor = "Better Price"
+            elif metric.metric == "Average Rank":
+                value = f"{abs(metric.gap):.1f} positions"
+                factor = "Better Rank"
+            elif metric.metric == "Average Delivery Days":
+                value = f"-{abs(metric.gap):.0f} days"
+                factor = "Faster Delivery"
+            else:
+                value = f"+{abs(metric.gap):.0f}"
+                factor = "More Appearances"
+            
+            chips.append(WinLoseChip(
+                factor=factor,
+                status="win",
+                value=value,
+                contribution=0.5,
+            ))
+    
+    # Metadata
+    metadata = {
+        "comparison_timestamp": datetime.now().isoformat(),
+        "s1_cards": s1['cards'],
+        "s2_cards": s2['cards'],
+    }
+    
+    return ComparisonResponse(
+        product_name=product_name,
+        source1=source1,
+        source2=source2,
+        metrics=metrics,
+        win_lose_chips=chips,
+        metadata=metadata,
+    )
@@ -0,0 +1,98 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+from fastapi import HTTPException
+from app.core.config import (
+    COMPUTE_POOL_ENABLED, COMPUTE_POOL_WORKERS, COMPUTE_POOL_QUEUE_DEPTH,
+    COMPUTE_POOL_RETRY_AFTER_SECONDS,
+)
+from app.core.logger import logger
+from app.core.profiling import run_profiled
+
+T = TypeVar("T")
+
+class ComputePool:
+    """
+    Bounded thread pool for CPU-heavy rendering, so pandas work never runs on
+    the event loop. At most `workers` tasks run and `queue_depth` wait; beyond
+    that, calls are rejected immediately with 503 instead of queueing.
+    Threads (not processes): tasks read the shared in-memory snapshot, and
+    numpy/pandas kernels release the GIL for most of their work.
+    """
+
+    def __init__(self, workers: int = COMPUTE_POOL_WORKERS, queue_depth: int = COMPUTE_POOL_QUEUE_DEPTH):
+        self.workers = workers
+        self.capacity = workers + queue_depth
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="compute"
+                )
+            return self._executor
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            if self.pending >= self.capacity:
+                self.rejected += 1
+                return False
+            self.pending += 1
+            return True
+
+    def _release(self, _future: Optional[Future] = None):
+        # Runs when the task finishes, even if the awaiting request was cancelled
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """Run fn(*args) in the pool; 503 if the pool and its queue are full."""
+        if not COMPUTE_POOL_ENABLED:
+            return fn(*args)  # Runs on the loop: covered by the request's own profile
+        
+        if not self._acquire():
+            logger.warning(f"Compute pool saturated ({self.capacity} tasks), rejecting request")
+            raise HTTPException(
+                status_code=503,
+                detail="Server busy, retry shortly",
+                headers={"Retry-After": str(COMPUTE_POOL_RETRY_AFTER_SECONDS)},
+            )
+        try:
+            # Caller's context (request timings, profile session) carries over into the worker thread
+            context = contextvars.copy_context()
+            future = self._get_executor().submit(context.run, run_profiled, fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": COMPUTE_POOL_ENABLED,
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+compute_pool = ComputePool()
+
+async def run_in_pool(fn: Callable[..., T], *args) -> T:
+    """Run a blocking (pandas) call in the shared compute pool."""
+    return await compute_pool.run(fn, *args)
@@ -1,73 +1,274 @@
+import threading
+import time
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Optional
-from app.core.config import EXCEL_FILE, CACHE_TTL_SECONDS, COLUMNS
+from typing import NamedTuple, Optional
+from app.core.config import (
+    CACHE_TTL_SECONDS, CACHE_REFRESH_AHEAD_SECONDS, COLUMNS, SHARED_SNAPSHOT,
+    SNAPSHOT_RECHECK_SECONDS, LOAD_RETRY_BACKOFF_SECONDS, LOAD_RETRY_BACKOFF_MAX_SECONDS,
+    FILE_WATCH_ENABLED,
+)
 from app.core.logger import logger
+from app.core.telemetry import timed
+from app.services.metrics import DERIVED_COLUMNS, add_derived_columns
+from app.services.filters import FilterIndex
+from app.services.compare_index import CompareIndex
+from app.services.home_summary import build_home_payload
+from app.services.prompt_index import PromptIndex
+from app.services.snapshot import (
+    EXTRA_ERROR_COLUMN, load_snapshot, ingest_excel, ingest_lock, read_generation, snapshot_is_stale
+)
+
+class LoadStats:
+    """Load counters and durations for a cache (surfaced in /api/health)."""
+
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.last_duration_ms: Optional[float] = None
+        self.total_duration_ms = 0.0
+        self.last_loaded_at: Optional[datetime] = None
+
+    def record(self, duration_s: float, ok: bool = True):
+        if not ok:
+            self.failures += 1
+            return
+        self.count += 1
+        self.last_duration_ms = round(duration_s * 1000, 2)
+        self.total_duration_ms += duration_s * 1000
+        self.last_loaded_at = datetime.now()
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "last_duration_ms": self.last_duration_ms,
+            "avg_duration_ms": round(self.total_duration_ms / self.count, 2) if self.count else None,
+            "last_loaded_at": self.last_loaded_at.isoformat() if self.last_loaded_at else None,
+        }
+
+class ServedData(NamedTuple):
+    """The frame being served with the generation and data version it belongs to."""
+    df: pd.DataFrame
+    generation: int
+    version: int
 
 class DataCache:
     """In-memory cache for DataFrame."""
-    
+
     def __init__(self):
         self.df: Optional[pd.DataFrame] = None
         self.loaded_at: Optional[datetime] = None
+        self.generation: int = 0
+        # Swapped as one reference, for readers that need df, generation and version to match
+        self.served: Optional[ServedData] = None
+        # Bumped on every swap; keys cached responses to the data they were built from
+        self.version: int = 0
         self.stats = {}
-    
+        # /dashboard/home response body, built once per load
+        self.home_payload: Optional[bytes] = None
+        self.filter_index: Optional[FilterIndex] = None
+        self.prompt_index: Optional[PromptIndex] = None
+        self.compare_index: Optional[CompareIndex] = None
+        # Single-flight guard: at most one load runs at a time
+        self.load_lock = threading.Lock()
+        self.load_stats = LoadStats()
+        # time.monotonic() of the last failed load and failures since the last
+        # success (retries back off exponentially from it)
+        self.last_failure_at: Optional[float] = None
+        self.consecutive_failures = 0
+        # Last generation read from disk (shared mode) and when
+        self._disk_generation = 0
+        self._disk_generation_checked_at: Optional[float] = None
+
+    def disk_generation(self) -> int:
+        """Generation on disk, re-read at most every SNAPSHOT_RECHECK_SECONDS."""
+        now = time.monotonic()
+        checked_at = self._disk_generation_checked_at
+        if checked_at is None or now - checked_at >= SNAPSHOT_RECHECK_SECONDS:
+            self._disk_generation = read_generation()
+            self._disk_generation_checked_at = now
+        return self._disk_generation
+
     def is_expired(self) -> bool:
-        """Check if cache expired."""
+        """
+        Check if cache expired: a newer snapshot generation exists (shared mode),
+        or the TTL lapsed. With FILE_WATCH_ENABLED the TTL is ignored and reloads
+        are driven by the file watcher instead.
+        """
         if not self.loaded_at:
             return True
+        if SHARED_SNAPSHOT and self.disk_generation() != self.generation:
+            return True
+        if FILE_WATCH_ENABLED:
+            return False
         return datetime.now() - self.loaded_at > timedelta(seconds=CACHE_TTL_SECONDS)
-    
+
+    def retry_delay(self) -> float:
+        """Backoff after the current run of failures: base × 2^(n-1), capped (0 if none)."""
+        if not self.consecutive_failures:
+            return 0.0
+        # Exponent capped so a long outage cannot overflow the float
+        doubling = 2 ** min(self.consecutive_failures - 1, 32)
+        return min(LOAD_RETRY_BACKOFF_SECONDS * doubling, LOAD_RETRY_BACKOFF_MAX_SECONDS)
+
+    def seconds_until_retry(self) -> float:
+        """Seconds until another load may be attempted (0 if allowed now)."""
+        if self.last_failure_at is None:
+            return 0.0
+        return max(self.last_failure_at + self.retry_delay() - time.monotonic(), 0.0)
+
+    def retry_allowed(self) -> bool:
+        """Not within the backoff after a failed load."""
+        return self.seconds_until_retry() == 0.0
+
+    def seconds_until_refresh(self) -> float:
+        """Seconds until the background refresher should reload (ahead of expiry)."""
+        if not self.loaded_at:
+            return 0.0
+        refresh_at = self.loaded_at + timedelta(
+            seconds=max(CACHE_TTL_SECONDS - CACHE_REFRESH_AHEAD_SECONDS, 1)
+        )
+        return max((refresh_at - datetime.now()).total_seconds(), 0.0)
+
     def clear(self):
         """Clear cache."""
         self.df = None
         self.loaded_at = None
+        self.generation = 0
+        self.served = None
         self.stats = {}
+        self.home_payload = None
+        self.filter_index = None
+        self.prompt_index = None
+        self.compare_index = None
 
 cache = DataCache()
 
-def load_excel() -> pd.DataFrame:
-    """Load Excel → DataFrame with validation."""
-    global cache
-    
-    # Return cached if valid
-    if cache.df is not None and not cache.is_expired():
-        logger.info("Returning cached DataFrame")
-        return cache.df
-    
-    logger.info(f"Loading Excel from {EXCEL_FILE}")
-    
+@timed("data_load")
+def _load_into_cache() -> pd.DataFrame:
+    """Load snapshot and swap it into the cache. Caller holds cache.load_lock."""
+    start = time.perf_counter()
     try:
-        df = pd.read_excel(EXCEL_FILE, sheet_name="Sheet1")
-        
-        # Standardize columns
-        df.rename(columns=str.lower, inplace=True)
-        
-        # Data cleaning
-        df['price'] = pd.to_numeric(df['price'], errors='coerce').fillna(-1)
-        df['delivery_days'] = pd.to_numeric(df['delivery_days'], errors='coerce').fillna(-1).astype(int)
-        df['delivery_fee'] = pd.to_numeric(df['delivery_fee'], errors='coerce').fillna(-1)
-        df['rank'] = pd.to_numeric(df['rank'], errors='coerce').fillna(0).astype(int)
+        # Typed Arrow snapshot; Excel is only parsed when the snapshot is missing/stale.
+        # Shared mode maps the file so all workers share one copy of the numeric columns.
+        df, generation, extras = load_snapshot(memory_map=SHARED_SNAPSHOT)
         
-        # Normalize source
-        df['source_normalized'] = df['source_normalized'].fillna('unknown')
+        # Derived columns are normally written at ingest (and shared when mapped);
+        # enrich here only for snapshots written before they existed
+        if not set(DERIVED_COLUMNS).issubset(df.columns):
+            df = add_derived_columns(df)
         
-        # Compute stats
+        loaded_at = datetime.now()
+        stats = compute_data_stats(df)
+        home_payload = build_home_payload(df, loaded_at)
+        filter_index = FilterIndex(df)
+        prompt_index = PromptIndex(df, extras)
+        compare_index = CompareIndex(df)
+
+        # Swap: everything is built before cache.df changes, readers holding the
+        # previous DataFrame keep a consistent snapshot
+        cache.stats = stats
+        cache.home_payload = home_payload
+        cache.filter_index = filter_index
+        cache.prompt_index = prompt_index
+        cache.compare_index = compare_index
+        cache.generation = generation
+        cache.loaded_at = loaded_at
         cache.df = df
-        cache.loaded_at = datetime.now()
-        cache.stats = compute_data_stats(df)
-        
-        logger.info(f"Loaded {len(df)} rows | {df['prompt_id'].nunique()} unique prompts")
+        cache.served = ServedData(df, generation, cache.version + 1)
+        cache.version += 1
+        cache.last_failure_at = None
+        cache.consecutive_failures = 0
+        cache.load_stats.record(time.perf_counter() - start)
+
+        logger.info(
+            f"Loaded {len(df)} rows | {df['prompt_id'].nunique()} unique prompts | "
+            f"generation {generation}"
+        )
         return df
-    
+
     except Exception as e:
-        logger.error(f"Error loading Excel: {e}")
+        cache.load_stats.record(time.perf_counter() - start, ok=False)
+        cache.last_failure_at = time.monotonic()
+        cache.consecutive_failures += 1
+        logger.error(
+            f"Error loading data: {e} (failure {cache.consecutive_failures}, "
+            f"retry in {cache.retry_delay():.1f}s)"
+        )
         raise
 
+def load_excel() -> pd.DataFrame:
+    """Load snapshot (ingested from Excel) → DataFrame with validation (blocking)."""
+
+    # Return cached if valid
+    if cache.df is not None and not cache.is_expired():
+        logger.info("Returning cached DataFrame")
+        return cache.df
+
+    with cache.load_lock:
+        # A concurrent caller may have loaded while we waited
+        if cache.df is not None and not cache.is_expired():
+            return cache.df
+        return _load_into_cache()
+
+def refresh_data(force: bool = False) -> bool:
+    """
+    Non-blocking refresh: reload unless a load is already in flight.
+    Returns True if this call performed the load.
+    """
+    if not cache.load_lock.acquire(blocking=False):
+        return False
+    try:
+        if not force and cache.df is not None and not cache.is_expired():
+            return False
+        _load_into_cache()
+        return True
+    except Exception:
+        # Keep serving the previous snapshot; next expiry retries
+        return False
+    finally:
+        cache.load_lock.release()
+
+class BackgroundRefresher:
+    """Daemon thread that reloads the cache shortly before it expires."""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="data-refresher", daemon=True
+        )
+        self._thread.start()
+        logger.info("Background data refresher started")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(cache.seconds_until_refresh()):
+            if not refresh_data(force=True):
+                # Failed (exponential backoff) or another load in flight: wait before checking again
+                self._stop.wait(max(cache.seconds_until_retry(), LOAD_RETRY_BACKOFF_SECONDS))
+
+refresher = BackgroundRefresher()
+
 def compute_data_stats(df: pd.DataFrame) -> dict:
-    """Compute data quality stats."""
+    """Compute data quality stats (and in-memory size, for capacity planning)."""
+    memory_bytes = int(df.memory_usage(index=True, deep=True).sum())
     return {
         "total_rows": len(df),
+        "memory_bytes": memory_bytes,
+        "bytes_per_row": round(memory_bytes / len(df), 1) if len(df) else 0.0,
+        "extra_parse_failures": int(df[EXTRA_ERROR_COLUMN].sum()) if EXTRA_ERROR_COLUMN in df.columns else 0,
         "unique_prompts": df['prompt_id'].nunique(),
         "unique_products": df['product_name'].nunique(),
         "unique_sources": df['source_normalized'].nunique(),
@@ -78,14 +279,72 @@ def compute_data_stats(df: pd.DataFrame) -> dict:
     }
 
 def get_data() -> pd.DataFrame:
-    """Get cached or fresh DataFrame."""
-    return load_excel()
+    """
+    Get cached DataFrame (stale-while-revalidate).
+    Only a cold cache blocks; an expired cache is served as-is while a
+    background thread reloads it (after failed attempts, only once the
+    exponential retry backoff has passed).
+    """
+    df = cache.df
+    if df is None:
+        return load_excel()
+    if cache.is_expired() and not cache.load_lock.locked() and cache.retry_allowed():
+        threading.Thread(target=refresh_data, name="data-refresh", daemon=True).start()
+    return df
+
+def get_served_data() -> ServedData:
+    """
+    Cached DataFrame with its generation and data version, read together
+    (separate get_data()/get_generation()/get_version() calls can straddle a reload).
+    """
+    get_data()
+    return cache.served
+
+def get_filter_index() -> Optional[FilterIndex]:
+    """Filter index for the current snapshot (apply_filters checks it matches the frame)."""
+    return cache.filter_index
+
+def get_prompt_index() -> PromptIndex:
+    """Prompt index for the current snapshot (loads data on a cold cache)."""
+    get_data()
+    return cache.prompt_index
+
+def get_generation() -> int:
+    """Snapshot generation currently served (page cursors are tied to it)."""
+    return cache.generation
+
+def get_version() -> int:
+    """Version of the data currently served (changes on every reload)."""
+    return cache.version
+
+def get_compare_index() -> CompareIndex:
+    """Per-(product, source) compare aggregates for the current snapshot (loads data on a cold cache)."""
+    get_data()
+    return cache.compare_index
+
+def get_home_payload() -> bytes:
+    """Pre-serialized home dashboard for the current snapshot (loads data on a cold cache)."""
+    get_data()
+    return cache.home_payload
 
 def get_stats() -> dict:
     """Get cache stats."""
     return cache.stats
 
+def reload_from_source():
+    """
+    Reload after the Excel file changed. Ingest is skipped if another worker
+    already refreshed the snapshot from the same change.
+    """
+    with ingest_lock():
+        if snapshot_is_stale():
+            ingest_excel()
+    with cache.load_lock:
+        return _load_into_cache()
+
 def reload_data():
-    """Force reload cache."""
-    cache.clear()
-    return load_excel()
+    """Force re-ingest from Excel and reload cache (other workers follow the new generation)."""
+    with ingest_lock():
+        ingest_excel()
+    with cache.load_lock:
+        return _load_into_cache()
@@ -1,6 +1,87 @@
+import numpy as np
 import pandas as pd
 from typing import Optional, List, Dict
+from app.core.config import MAX_RANK
+from app.core.telemetry import timed
 
+# Bit layout of FilterIndex.flags: bits 0..MAX_RANK-1 = rank 1..MAX_RANK
+HAS_PRICE_BIT = 1 << MAX_RANK
+HAS_DELIVERY_BIT = 1 << (MAX_RANK + 1)
+
+class FilterIndex:
+    """
+    Row index over the cached snapshot, built once per load.
+    - product_name / source_normalized: value → sorted row positions (posting lists)
+    - rank bucket 1..MAX_RANK, has_price, has_delivery: bits in one uint8 per row
+    A filter combination resolves to a row selection with bitwise ops only.
+    """
+    
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.n_rows = len(df)
+        self.products = _posting_lists(df['product_name'])
+        self.sources = _posting_lists(df['source_normalized'])
+        self.rank = df['rank'].to_numpy()
+        
+        flags = np.zeros(self.n_rows, dtype=np.uint8)
+        for r in range(1, MAX_RANK + 1):
+            flags[self.rank == r] |= 1 << (r - 1)
+        flags[df['price'].to_numpy() > 0] |= HAS_PRICE_BIT
+        flags[df['delivery_days'].to_numpy() >= 0] |= HAS_DELIVERY_BIT
+        self.flags = flags
+    
+    def _values_mask(self, postings: Dict[str, np.ndarray], values: List[str]) -> np.ndarray:
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for value in values:
+            rows = postings.get(value)
+            if rows is not None:
+                mask[rows] = True
+        return mask
+    
+    def select(
+        self,
+        products: Optional[List[str]] = None,
+        sources: Optional[List[str]] = None,
+        rank_min: int = 1,
+        rank_max: int = 5,
+        has_price: bool = False,
+        has_delivery: bool = False,
+    ) -> np.ndarray:
+        """Boolean row mask for a filter combination."""
+        
+        # Rank range: OR of rank buckets, unless the range reaches outside them
+        if 1 <= rank_min and rank_max <= MAX_RANK:
+            rank_bits = sum(1 << (r - 1) for r in range(rank_min, rank_max + 1))
+            mask = (self.flags & rank_bits) != 0
+        else:
+            mask = (self.rank >= rank_min) & (self.rank <= rank_max)
+        
+        required = (HAS_PRICE_BIT if has_price else 0) | (HAS_DELIVERY_BIT if has_delivery else 0)
+        if required:
+            mask &= (self.flags & required) == required
+        if products is not None:
+            mask &= self._values_mask(self.products, products)
+        if sources is not None:
+            mask &= self._values_mask(self.sources, sources)
+        return mask
+
+def _posting_lists(column: pd.Series) -> Dict[str, np.ndarray]:
+    """Value → sorted row positions (one factorize + one stable sort)."""
+    codes, uniques = pd.factorize(column)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    return {
+        value: order[bounds[i]:bounds[i + 1]]
+        for i, value in enumerate(uniques)
+    }
+
+def normalize_list_param(value: Optional[str]) -> Optional[str]:
+    """Comma-separated filter value in canonical form: stripped, de-duplicated, sorted."""
+    if not value:
+        return value
+    return ",".join(sorted({v.strip() for v in value.split(",")}))
+
+@timed()
 def apply_filters(
     df: pd.DataFrame,
     product: Optional[str] = None,
@@ -9,19 +90,31 @@ def apply_filters(
     rank_max: int = 5,
     has_price: bool = False,
     has_delivery: bool = False,
+    index: Optional[FilterIndex] = None,
 ) -> pd.DataFrame:
-    """Apply filters to DataFrame."""
+    """
+    Apply filters to DataFrame.
+    With an index built for this same frame, the filters resolve to one row
+    selection (no full copy, no string comparisons); otherwise column scans.
+    The result may be `df` itself; do not mutate it.
+    """
+    
+    products = [p.strip() for p in product.split(",")] if product else None
+    sources = [s.strip().lower() for s in source.split(",")] if source else None
     
-    filtered = df.copy()
+    if index is not None and index.df is df:
+        mask = index.select(products, sources, rank_min, rank_max, has_price, has_delivery)
+        # Nothing filtered out: hand back the snapshot itself (callers treat it as read-only)
+        return df if mask.all() else df[mask]
+    
+    filtered = df
     
     # Product filter
-    if product:
-        products = [p.strip() for p in product.split(",")]
+    if products is not None:
         filtered = filtered[filtered['product_name'].isin(products)]
     
     # Source filter
-    if source:
-        sources = [s.strip().lower() for s in source.split(",")]
+    if sources is not None:
         filtered = filtered[filtered['source_normalized'].isin(sources)]
     
     # Rank range
@@ -0,0 +1,41 @@
+import pandas as pd
+from datetime import datetime
+from app.models.schemas import HomeDashboardResponse, KPIMetrics, LossReason, SourceBreakdown
+from app.services.metrics import (
+    calculate_global_metrics, calculate_loss_reasons, calculate_source_breakdown
+)
+from app.utils.serialization import json_bytes
+
+def build_home_payload(df: pd.DataFrame, loaded_at: datetime) -> bytes:
+    """
+    Everything /dashboard/home returns, serialized once per snapshot load
+    (no request parameter affects it).
+    """
+    
+    # Calculate all KPIs
+    kpis_dict = calculate_global_metrics(df, full_snapshot=True)
+    kpis = KPIMetrics(**kpis_dict)
+    
+    # Loss reasons
+    loss_reasons = [LossReason(**lr) for lr in calculate_loss_reasons(df)]
+    
+    # Source breakdown
+    source_breakdown = [
+        SourceBreakdown(**sb) for sb in calculate_source_breakdown(df)
+    ]
+    
+    # Metadata
+    metadata = {
+        "total_prompts": df['prompt_id'].nunique(),
+        "total_cards": len(df),
+        "data_freshness": loaded_at.isoformat(),
+        "rows_analyzed": len(df),
+    }
+    
+    response = HomeDashboardResponse(
+        kpis=kpis,
+        loss_reasons=loss_reasons,
+        source_breakdown=source_breakdown,
+        metadata=metadata,
+    )
+    return json_bytes(response)
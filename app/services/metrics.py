@@ -1,54 +1,70 @@
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple
 from app.core.config import COLUMNS, INVALID_PRICE, INVALID_DELIVERY
+from app.core.telemetry import timed
 from app.utils.helpers import (
-    is_valid_price, is_valid_delivery, get_delivery_strength,
-    calculate_nrs, get_rank_presence_score, calculate_price_competitiveness_flag
+    calculate_price_competitiveness_flag, rank_presence_scores, delivery_strength_scores, nrs_scores,
 )
 
-def calculate_global_metrics(df: pd.DataFrame) -> Dict:
-    """Calculate global KPI metrics."""
+def calculate_global_metrics(df: pd.DataFrame, full_snapshot: bool = False) -> Dict:
+    """
+    Calculate global KPI metrics.
+    Pure and vectorized: reads columns only, never adds columns to `df`
+    (it is usually the shared cached snapshot). Pass full_snapshot=True only
+    for the unfiltered snapshot: the load-time `is_cheapest` flags compare
+    each card with its whole prompt, which a filtered frame may not contain.
+    """
     
     total_prompts = df['prompt_id'].nunique()
+    rank = df['rank'].to_numpy()
+    price = df['price'].to_numpy()
     
     # G-SoV (Generative Share of Voice): % of prompts where source appears at rank 1 or 2
-    gsov_by_source = {}
-    for source in df['source_normalized'].unique():
-        source_df = df[df['source_normalized'] == source]
-        top_rank_prompts = source_df[source_df['rank'] <= 2]['prompt_id'].nunique()
-        gsov_by_source[source] = round(top_rank_prompts / total_prompts, 3)
+    top_ranked = df[rank <= 2]
+    top_prompts_by_source = (
+        top_ranked.groupby('source_normalized', sort=False, observed=True)['prompt_id'].nunique()
+        .reindex(df['source_normalized'].unique(), fill_value=0)
+    )
+    gsov_by_source = {
+        source: round(float(count) / total_prompts, 3)
+        for source, count in top_prompts_by_source.items()
+    }
     
     gsov_overall = round(
-        df[df['rank'] <= 2]['prompt_id'].nunique() / total_prompts, 3
+        top_ranked['prompt_id'].nunique() / total_prompts, 3
     )
     
     # Average rank position
     avg_rank = round(df['rank'].mean(), 2)
     
     # Rank presence score (avg of all cards)
-    df['rank_presence'] = df['rank'].apply(get_rank_presence_score)
-    rank_presence_avg = round(df['rank_presence'].mean(), 2)
-    
-    # Price competitiveness rate
-    def is_cheapest(group):
-        valid_prices = group[group['price'] > 0]['price']
-        if len(valid_prices) == 0:
-            return pd.Series(0, index=group.index)
-        min_price = valid_prices.min()
-        return (group['price'] == min_price).astype(int)
-    
-    df['is_cheapest'] = df.groupby('prompt_id', group_keys=False).apply(is_cheapest)
+    rank_presence = (
+        df['rank_presence'].to_numpy() if 'rank_presence' in df.columns
+        else rank_presence_scores(rank)
+    )
+    rank_presence_avg = round(rank_presence.mean(), 2)
+    
+    # Price competitiveness rate: valid-price cards matching their prompt's min valid price
+    valid_price = price > 0
+    is_cheapest = (
+        df['is_cheapest'].to_numpy() if full_snapshot and 'is_cheapest' in df.columns
+        else cheapest_in_prompt_flags(df)
+    )
     price_competitiveness = round(
-        df[df['price'] > 0]['is_cheapest'].sum() / len(df[df['price'] > 0]), 3
-    ) if len(df[df['price'] > 0]) > 0 else 0.0
+        is_cheapest.sum() / valid_price.sum(), 3
+    ) if valid_price.any() else 0.0
     
     # Delivery strength score
-    df['delivery_strength'] = df['delivery_days'].apply(get_delivery_strength)
-    delivery_strength_avg = round(df['delivery_strength'].mean(), 2)
+    delivery_strength = (
+        df['delivery_strength'].to_numpy() if 'delivery_strength' in df.columns
+        else delivery_strength_scores(df['delivery_days'].to_numpy())
+    )
+    delivery_strength_avg = round(delivery_strength.mean(), 2)
     
     # Prompt coverage
     prompt_coverage = round(
-        df['prompt_id'].nunique() / df['prompt_id'].nunique(), 3
+        total_prompts / total_prompts, 3
     )  # 1.0 for now (you appear in all)
     
     return {
@@ -72,26 +88,41 @@ def calculate_loss_reasons(df: pd.DataFrame) -> List[Dict]:
         "lower_rank_naturally": 0,
     }
     
-    for prompt_id in df['prompt_id'].unique():
-        group = df[df['prompt_id'] == prompt_id]
-        best_rank_row = group.loc[group['rank'].idxmin()]
-        best_rank = best_rank_row['rank']
-        
-        if best_rank > 1:
-            for _, row in group.iterrows():
-                if row['rank'] < best_rank_row['rank']:
-                    if is_valid_price(row['price']) and is_valid_price(best_rank_row['price']):
-                        if row['price'] < best_rank_row['price']:
-                            loss_categories["higher_price"] += 1
-                    
-                    if is_valid_delivery(row['delivery_days']) and is_valid_delivery(best_rank_row['delivery_days']):
-                        if row['delivery_days'] < best_rank_row['delivery_days']:
-                            loss_categories["slower_delivery"] += 1
-                
-                if not is_valid_price(row['price']):
-                    loss_categories["missing_price"] += 1
-                if not is_valid_delivery(row['delivery_days']):
-                    loss_categories["missing_delivery"] += 1
+    rank = df['rank'].to_numpy()
+    price = df['price'].to_numpy()
+    delivery = df['delivery_days'].to_numpy()
+    
+    # Position of each prompt's best-ranked card: stable sort by (prompt, rank),
+    # first row of each prompt run = first idxmin, as the per-group scan did
+    codes, uniques = pd.factorize(df['prompt_id'])
+    order = np.lexsort((rank, codes))
+    sorted_codes = codes[order]
+    run_start = np.r_[True, sorted_codes[1:] != sorted_codes[:-1]][:len(order)]  # [] when df is empty
+    best_pos = np.empty(len(uniques), dtype=np.intp)
+    best_pos[sorted_codes[run_start]] = order[run_start]
+    best_row = best_pos[codes]
+    
+    best_rank = rank[best_row]
+    best_price = price[best_row]
+    best_delivery = delivery[best_row]
+    
+    valid_price = price > 0
+    valid_delivery = delivery >= 0
+    
+    # Only prompts whose best card is not #1 contribute. No card can outrank the
+    # prompt's best card, so the price/delivery rules below never fire; they are
+    # kept so the counts match the original per-row rules exactly.
+    losing = best_rank > 1
+    outranks_best = losing & (rank < best_rank)
+    
+    loss_categories["higher_price"] += int(
+        (outranks_best & valid_price & (best_price > 0) & (price < best_price)).sum()
+    )
+    loss_categories["slower_delivery"] += int(
+        (outranks_best & valid_delivery & (best_delivery >= 0) & (delivery < best_delivery)).sum()
+    )
+    loss_categories["missing_price"] += int((losing & ~valid_price).sum())
+    loss_categories["missing_delivery"] += int((losing & ~valid_delivery).sum())
     
     total = sum(loss_categories.values()) or 1
     
@@ -126,13 +157,35 @@ def calculate_source_breakdown(df: pd.DataFrame) -> List[Dict]:
     
     return sorted(breakdown, key=lambda x: x['avg_rank'])
 
+@timed()
 def calculate_nrs_per_row(df: pd.DataFrame) -> pd.DataFrame:
-    """Add NRS column to dataframe (per-prompt max_rank)."""
-    
-    def compute_nrs(group):
-        max_rank = group['rank'].max()
-        group['nrs'] = group['rank'].apply(lambda r: calculate_nrs(r, max_rank))
-        return group
-    
-    df = df.groupby('prompt_id', group_keys=False).apply(compute_nrs)
+    """
+    Add NRS column to dataframe (per-prompt max_rank).
+    NRS is relative to the cards in `df`, so a filtered frame gets its own
+    values (the load-time `nrs` column covers the full dataset).
+    """
+    max_rank = df.groupby('prompt_id', sort=False, observed=True)['rank'].transform('max')
+    return df.assign(nrs=nrs_scores(df['rank'].to_numpy(), max_rank.to_numpy()))
+
+def cheapest_in_prompt_flags(df: pd.DataFrame) -> np.ndarray:
+    """True for valid-price cards priced at their prompt's minimum valid price."""
+    price = df['price'].to_numpy()
+    valid_price = price > 0
+    prompt_min_price = (
+        df['price'].where(valid_price).groupby(df['prompt_id'], sort=False, observed=True).transform('min')
+    ).to_numpy()
+    return valid_price & (price == prompt_min_price)
+
+# Per-row columns that depend only on the dataset, computed once per snapshot
+DERIVED_COLUMNS = ["nrs", "rank_presence", "delivery_strength", "is_cheapest"]
+
+def add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Enrichment stage: add DERIVED_COLUMNS to a freshly loaded frame (in place)."""
+    rank = df['rank'].to_numpy()
+    max_rank = df.groupby('prompt_id', sort=False, observed=True)['rank'].transform('max').to_numpy()
+    
+    df['nrs'] = nrs_scores(rank, max_rank)
+    df['rank_presence'] = rank_presence_scores(rank)
+    df['delivery_strength'] = delivery_strength_scores(df['delivery_days'].to_numpy())
+    df['is_cheapest'] = cheapest_in_prompt_flags(df)
     return df
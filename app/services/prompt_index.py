@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+from app.utils.helpers import round_to_decimals
+from app.services.snapshot import ExtraStore
+
+# Columns a prompt detail card needs, stored contiguously per prompt
+CARD_COLUMNS = [
+    "card_id", "product_name", "rank", "source_normalized",
+    "price", "price_currency", "delivery_days", "delivery_fee",
+]
+
+EMPTY_PRICE_STATS = {
+    "min_price": 0.0,
+    "max_price": 0.0,
+    "median_price": 0.0,
+    "your_price": None,
+    "your_percentile": None,
+}
+
+class PromptIndex:
+    """
+    prompt_id → contiguous slice of `frame` (cards already sorted by rank)
+    plus precomputed prompt text, product, source count and price stats.
+    Built once per snapshot load; `extras` holds the pre-parsed `extra` lists.
+    """
+
+    def __init__(self, df: pd.DataFrame, extras: ExtraStore):
+        self.extras = extras
+        codes, prompt_ids = pd.factorize(df['prompt_id'])
+        rank = df['rank'].to_numpy()
+
+        # Stable sort by (prompt, rank): ties keep their original row order
+        order = np.lexsort((rank, codes))
+        sorted_codes = codes[order]
+        valid_rows = sorted_codes >= 0
+        order, sorted_codes = order[valid_rows], sorted_codes[valid_rows]
+        bounds = np.searchsorted(sorted_codes, np.arange(len(prompt_ids) + 1))
+
+        columns = [c for c in CARD_COLUMNS if c in df.columns]
+        self.frame = df[columns].take(order).reset_index(drop=True)
+        # Row positions in the source frame, aligned with `frame`
+        self.rows = order
+        self.entries: Dict[str, Dict] = {}
+
+        price = self.frame['price'].to_numpy()
+        valid_price = price > 0
+        frame_codes = pd.Series(sorted_codes)
+
+        # Per-prompt aggregates in one grouped pass each
+        valid_prices = pd.Series(price).where(valid_price)
+        price_groups = valid_prices.groupby(frame_codes)
+        min_price = price_groups.min().to_numpy()
+        max_price = price_groups.max().to_numpy()
+        median_price = price_groups.median().to_numpy()
+        valid_count = price_groups.count().to_numpy()
+
+        # Best-ranked card's price vs the prompt's valid prices (percentile rank)
+        first_price = price[bounds[:-1]]
+        below_first = valid_price & (price < first_price[sorted_codes])
+        below_count = np.bincount(sorted_codes[below_first], minlength=len(prompt_ids))
+
+        source_codes = pd.factorize(self.frame['source_normalized'])[0]
+        unique_sources = (
+            pd.DataFrame({"prompt": sorted_codes, "source": source_codes})
+            .groupby("prompt")["source"].nunique().to_numpy()
+        )
+
+        # Prompt text: first row of the prompt in sheet order
+        prompt_text = (
+            pd.Series(df['prompts'].to_numpy()).groupby(codes).first().to_dict()
+            if 'prompts' in df.columns else {}
+        )
+        product_names = self.frame['product_name'].to_numpy()
+
+        for i, prompt_id in enumerate(prompt_ids):
+            start, stop = int(bounds[i]), int(bounds[i + 1])
+
+            if valid_count[i] > 0:
+                your_price = first_price[i] if first_price[i] > 0 else None
+                price_stats = {
+                    "min_price": round_to_decimals(min_price[i]),
+                    "max_price": round_to_decimals(max_price[i]),
+                    "median_price": round_to_decimals(median_price[i]),
+                    "your_price": round_to_decimals(your_price) if your_price else None,
+                    "your_percentile": round_to_decimals(
+                        (int(below_count[i]) / int(valid_count[i])) * 100
+                    ) if your_price else None,
+                }
+            else:
+                price_stats = EMPTY_PRICE_STATS
+
+            self.entries[prompt_id] = {
+                "start": start,
+                "stop": stop,
+                "product_name": product_names[start],
+                "prompt_text": prompt_text.get(i, "N/A"),
+                "unique_sources": int(unique_sources[i]),
+                "price_stats": price_stats,
+            }
+
+    def get(self, prompt_id: str) -> Optional[Dict]:
+        """Entry for a prompt, or None if unknown."""
+        return self.entries.get(prompt_id)
+
+    def cards(self, entry: Dict) -> pd.DataFrame:
+        """The prompt's cards, sorted by rank (a slice, no search)."""
+        return self.frame.iloc[entry["start"]:entry["stop"]]
+
+    def card_extras(self, entry: Dict) -> List[List[str]]:
+        """Parsed `extra` items for the prompt's cards, aligned with cards()."""
+        return [self.extras.get(row) for row in self.rows[entry["start"]:entry["stop"]].tolist()]
@@ -0,0 +1,201 @@
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple, TypeVar
+from fastapi import Request, Response
+from app.core.config import (
+    RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES
+)
+from app.core.profiling import profiling_active
+from app.core.telemetry import span
+from app.services.compute_pool import run_in_pool
+from app.services.data_loader import get_version
+from app.utils.serialization import JSON_MEDIA_TYPE
+
+T = TypeVar("T")
+
+class CachedResponse(NamedTuple):
+    """Rendered JSON body and its weak ETag (content hash)."""
+    body: bytes
+    etag: str
+
+def make_etag(body: bytes) -> str:
+    """
+    Weak ETag of the JSON body: identical bytes → identical tag, in every
+    worker. Weak because GZipMiddleware may send the same entity gzipped,
+    and a strong tag must differ per content coding.
+    """
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+def cache_key(endpoint: str, params: Dict[str, Any], version: int) -> Tuple:
+    """Endpoint + params in sorted order + data version (params already canonical)."""
+    return (endpoint, tuple(sorted(params.items())), version)
+
+class ResponseCache:
+    """LRU of rendered responses, bounded by entry count and total body bytes."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Tuple, body: bytes) -> CachedResponse:
+        entry = CachedResponse(body, make_etag(body))
+        if len(body) > self.max_bytes:
+            return entry  # Never cacheable; served uncached
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.body)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+                self.evictions += 1
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": RESPONSE_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+response_cache = ResponseCache()
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key await one shared computation instead
+    of each running it. The key includes the data version, so requests for a
+    newer snapshot never join a computation over the old one. Event-loop local:
+    the in-flight map is only touched from the loop.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: Tuple, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        # shield: a caller that disconnects does not cancel the shared work
+        return await asyncio.shield(task)
+
+    def _done(self, key: Tuple, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Retrieved here so a failure nobody awaited is not logged as lost
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
+
+single_flight = SingleFlight()
+
+def _opaque_tag(etag: str) -> str:
+    """Tag without the W/ prefix (weak comparison ignores it on both sides)."""
+    return etag[2:] if etag.startswith("W/") else etag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 specifies for GET)."""
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or _opaque_tag(etag) in [_opaque_tag(t) for t in tags]
+
+async def _render_entry(key: Tuple, render: Callable[[], bytes]) -> CachedResponse:
+    """Render in the compute pool and store the result (one call per in-flight key)."""
+    body = await run_in_pool(render)
+    if RESPONSE_CACHE_ENABLED:
+        return response_cache.put(key, body)
+    return CachedResponse(body, make_etag(body))
+
+async def cached_json_response(
+    request: Request, endpoint: str, params: Dict[str, Any], render: Callable[[], bytes],
+    version: Optional[int] = None,
+) -> Response:
+    """
+    Serve a rendered JSON body from the response cache, rendering on a miss.
+    `render` runs in the compute pool (hits never leave the event loop), and
+    identical concurrent misses share one render (single-flight).
+    Every response carries a weak ETag; a matching If-None-Match gets 304.
+    Errors raised by `render` propagate to every waiter and nothing is cached.
+    Profiled requests (X-Profile) skip the lookup and always render.
+    A `render` bound to a frame the caller already read must pass that
+    frame's data version (ServedData.version): reading it here could key an
+    old body under a newer version.
+    """
+    key = cache_key(endpoint, params, get_version() if version is None else version)
+    if profiling_active():
+        # Profiled request: always render here, so the profile shows the work
+        with span("render"):
+            entry = await _render_entry(key, render)
+    else:
+        entry = response_cache.get(key) if RESPONSE_CACHE_ENABLED else None
+        if entry is None:
+            # Miss: pool queueing + render (or waiting on an identical in-flight render)
+            with span("render"):
+                entry = await single_flight.do(key, lambda: _render_entry(key, render))
+
+    return _json_response(request, entry)
+
+def prebuilt_json_response(request: Request, endpoint: str, get_body: Callable[[], bytes]) -> Response:
+    """
+    Serve a body that already exists (built at snapshot load) with the same
+    ETag / 304 handling as cached_json_response, without the compute pool:
+    there is nothing to render, so a saturated pool never 503s it. The entry
+    is still stored in the response cache so the ETag is hashed once per load.
+    """
+    # Version before body: a reload in between stores the newer body under
+    # the older key (never the reverse)
+    key = cache_key(endpoint, {}, get_version())
+    entry = response_cache.get(key) if RESPONSE_CACHE_ENABLED else None
+    if entry is None:
+        body = get_body()
+        entry = response_cache.put(key, body) if RESPONSE_CACHE_ENABLED else CachedResponse(body, make_etag(body))
+    return _json_response(request, entry)
+
+def _json_response(request: Request, entry: CachedResponse) -> Response:
+    # no-cache: clients may store the body but must revalidate (cheap with the ETag)
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type=JSON_MEDIA_TYPE, headers=headers)
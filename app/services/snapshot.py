@@ -0,0 +1,297 @@
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+from app.core.config import EXCEL_FILE, SNAPSHOT_FILE, INVALID_CURRENCY
+from app.core.logger import logger
+from app.services.metrics import DERIVED_COLUMNS, add_derived_columns
+from app.services.watcher import file_sha256
+from app.utils.helpers import parse_extra_items
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single-process use only
+    fcntl = None
+
+# Schema metadata key carrying the snapshot generation
+GENERATION_KEY = b"generation"
+# Schema metadata key carrying the sha256 of the Excel file the snapshot was ingested from
+SOURCE_SHA256_KEY = b"source_sha256"
+
+# Parsed `extra` lists: stored as an Arrow list<string> column, lifted out of the
+# table on read (never materialized as per-row Python lists)
+EXTRA_ITEMS_COLUMN = "extra_items"
+EXTRA_ERROR_COLUMN = "extra_parse_error"
+
+class ExtraStore:
+    """
+    Parsed `extra` lists for every row: row i's items are
+    pool[codes[offsets[i]:offsets[i + 1]]]. Repeated strings share one pool entry.
+    """
+
+    def __init__(self, offsets: np.ndarray, codes: np.ndarray, pool: List[str]):
+        self.offsets = offsets
+        self.codes = codes
+        self.pool = pool
+
+    @classmethod
+    def from_arrow(cls, items: pa.ChunkedArray) -> "ExtraStore":
+        items = items.combine_chunks()
+        # List offsets index into the (unsliced) child values array
+        encoded = items.values.dictionary_encode()
+        return cls(
+            offsets=items.offsets.to_numpy(),
+            codes=encoded.indices.to_numpy(zero_copy_only=False),
+            pool=encoded.dictionary.to_pylist(),
+        )
+
+    @classmethod
+    def from_lists(cls, lists: List[List[str]]) -> "ExtraStore":
+        return cls.from_arrow(pa.chunked_array([pa.array(lists, type=pa.list_(pa.string()))]))
+
+    def get(self, row: int) -> List[str]:
+        """Items for one row position."""
+        pool = self.pool
+        return [pool[c] for c in self.codes[self.offsets[row]:self.offsets[row + 1]].tolist()]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+class Snapshot(NamedTuple):
+    """A loaded snapshot: card table, its generation, and parsed extras aligned by row."""
+    df: pd.DataFrame
+    generation: int
+    extras: ExtraStore
+
+# Columns the API reads. The snapshot keeps the whole sheet; the rest (raw
+# response text, p_number/p_value...) is never loaded into a worker
+SERVED_COLUMNS = [
+    "prompts", "prompt_id", "product_name", "rank", "price", "price_currency",
+    "delivery_fee", "delivery_days", "source_normalized", "card_id",
+    *DERIVED_COLUMNS, EXTRA_ITEMS_COLUMN, EXTRA_ERROR_COLUMN,
+]
+
+# Repeated strings stored dictionary-encoded (pandas categoricals, Arrow dictionary
+# columns in the snapshot). card_id is unique per row: a dictionary would hold
+# every value once more plus a codes array, so it stays a plain string column.
+CATEGORICAL_COLUMNS = ["product_name", "source_normalized", "prompt_id", "price_currency"]
+# rank is 0-5 and delivery days are small counts
+NARROW_INT_COLUMNS = {"rank": np.int8, "delivery_days": np.int16}
+
+def compact_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Categoricals + narrow ints for the card table (in place; no-op on a compact frame)."""
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            # Sorted categories: groupby(sort=True) keeps lexical order
+            df[col] = df[col].astype("category")
+    
+    for col, dtype in NARROW_INT_COLUMNS.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        bounds = np.iinfo(dtype)
+        if len(df) and (df[col].min() < bounds.min or df[col].max() > bounds.max):
+            logger.warning(f"'{col}' values exceed {np.dtype(dtype).name}, kept as {df[col].dtype}")
+            continue
+        df[col] = df[col].astype(dtype)
+    
+    return df
+
+def parse_extra(df: pd.DataFrame) -> pd.DataFrame:
+    """Parse `extra` once: list column + per-row parse-error flag (replace the raw column)."""
+    values = df.pop('extra').tolist() if 'extra' in df.columns else [None] * len(df)
+    parsed = [parse_extra_items(value) for value in values]
+    df[EXTRA_ITEMS_COLUMN] = pd.Series([items for items, _ in parsed], index=df.index, dtype=object)
+    df[EXTRA_ERROR_COLUMN] = np.array([not ok for _, ok in parsed], dtype=bool)
+    return df
+
+def clean_raw_data(df: pd.DataFrame) -> pd.DataFrame:
+    """Apply standard cleaning to the raw sheet (column names, sentinels, types)."""
+
+    # Standardize columns
+    df.rename(columns=str.lower, inplace=True)
+
+    # Data cleaning
+    df['price'] = pd.to_numeric(df['price'], errors='coerce').fillna(-1)
+    df['delivery_days'] = pd.to_numeric(df['delivery_days'], errors='coerce').fillna(-1).astype(int)
+    df['delivery_fee'] = pd.to_numeric(df['delivery_fee'], errors='coerce').fillna(-1)
+    df['rank'] = pd.to_numeric(df['rank'], errors='coerce').fillna(0).astype(int)
+
+    # Normalize source
+    df['source_normalized'] = df['source_normalized'].fillna('unknown')
+    df['price_currency'] = df['price_currency'].fillna(INVALID_CURRENCY)
+
+    # Any remaining object column: keep strings, leave missing as null
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+
+    return df
+
+def generation_path(snapshot_path: Path = SNAPSHOT_FILE) -> Path:
+    """Sidecar file holding the current snapshot generation."""
+    return snapshot_path.with_suffix(".gen")
+
+def read_generation(snapshot_path: Path = SNAPSHOT_FILE) -> int:
+    """Current generation on disk (0 if no snapshot has been written yet)."""
+    try:
+        return int(generation_path(snapshot_path).read_text().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+def _replace_atomic(path: Path, write_fn):
+    """Write via tmp file + rename so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    write_fn(tmp_path)
+    os.replace(tmp_path, path)
+
+@contextmanager
+def ingest_lock(snapshot_path: Path = SNAPSHOT_FILE):
+    """Cross-process lock so only one worker ingests at a time."""
+    if fcntl is None:
+        yield
+        return
+    lock_path = snapshot_path.with_suffix(".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def ingest_excel(
+    excel_path: Path = EXCEL_FILE, snapshot_path: Path = SNAPSHOT_FILE
+) -> int:
+    """Excel → cleaned + enriched DataFrame → Arrow IPC snapshot on disk. Returns generation."""
+
+    logger.info(f"Ingesting Excel {excel_path} → {snapshot_path}")
+
+    # Hashed before reading: a write racing the ingest leaves the snapshot stale, not wrong
+    source_sha256 = file_sha256(excel_path)
+    df = pd.read_excel(excel_path, sheet_name="Sheet1")
+    df = clean_raw_data(df)
+    df = compact_columns(df)
+    df = add_derived_columns(df)
+    df = parse_extra(df)
+    generation = write_snapshot(df, snapshot_path, source_sha256)
+
+    logger.info(
+        f"Snapshot written: {len(df)} rows, {len(df.columns)} columns | generation {generation} | "
+        f"{int(df[EXTRA_ERROR_COLUMN].sum())} unparseable extra values"
+    )
+    return generation
+
+def write_snapshot(
+    df: pd.DataFrame, snapshot_path: Path = SNAPSHOT_FILE, source_sha256: Optional[str] = None
+) -> int:
+    """Write an immutable snapshot and bump the generation. Returns new generation."""
+
+    generation = read_generation(snapshot_path) + 1
+
+    table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+    metadata = {**(table.schema.metadata or {}), GENERATION_KEY: str(generation).encode()}
+    if source_sha256:
+        metadata[SOURCE_SHA256_KEY] = source_sha256.encode()
+    table = table.replace_schema_metadata(metadata)
+
+    def _write(path: Path):
+        # Uncompressed Arrow IPC file: readers can memory-map it without a decode step
+        with pa.OSFile(str(path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    # Snapshot first, then generation: a reader that sees the new generation
+    # is guaranteed to map the new file
+    _replace_atomic(snapshot_path, _write)
+    _replace_atomic(generation_path(snapshot_path), lambda p: p.write_text(str(generation)))
+    return generation
+
+def _mapped_type(arrow_type: pa.DataType):
+    """Keep plain string columns in the mapped Arrow buffers instead of copying them to objects."""
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+def read_snapshot(
+    snapshot_path: Path = SNAPSHOT_FILE, memory_map: bool = False
+) -> Snapshot:
+    """
+    Read the typed snapshot written by ingest_excel (SERVED_COLUMNS only).
+    memory_map=True maps the file instead of copying it: numeric columns become
+    read-only zero-copy views and plain string columns stay Arrow-backed
+    (pd.ArrowDtype), all in the page cache shared by every process that maps
+    the same generation.
+    """
+    if memory_map:
+        source = pa.memory_map(str(snapshot_path), "r")
+    else:
+        source = pa.OSFile(str(snapshot_path), "rb")
+    table = pa.ipc.open_file(source).read_all()
+
+    metadata = table.schema.metadata or {}
+    generation = int(metadata.get(GENERATION_KEY, b"0"))
+
+    # Snapshots written before extras were parsed at ingest still need raw `extra`
+    served = SERVED_COLUMNS if EXTRA_ITEMS_COLUMN in table.column_names else SERVED_COLUMNS + ["extra"]
+    table = table.select([c for c in table.column_names if c in served])
+    to_pandas_options = {"split_blocks": True, "types_mapper": _mapped_type} if memory_map else {}
+
+    if EXTRA_ITEMS_COLUMN in table.column_names:
+        extras = ExtraStore.from_arrow(table.column(EXTRA_ITEMS_COLUMN))
+        table = table.drop([EXTRA_ITEMS_COLUMN])
+        df = table.to_pandas(**to_pandas_options)
+    else:
+        df = parse_extra(table.to_pandas(**to_pandas_options))
+        extras = ExtraStore.from_lists(df.pop(EXTRA_ITEMS_COLUMN).tolist())
+
+    # Snapshots written before the compact schema are converted on read
+    return Snapshot(compact_columns(df), generation, extras)
+
+def snapshot_is_stale(
+    excel_path: Path = EXCEL_FILE, snapshot_path: Path = SNAPSHOT_FILE
+) -> bool:
+    """
+    Snapshot missing, or not ingested from the current Excel content. A newer
+    mtime is enough; otherwise (a copy or restore can carry an older mtime)
+    the Excel hash is compared with the one recorded at ingest.
+    """
+    if not snapshot_path.exists():
+        return True
+    if not excel_path.exists():
+        return False
+    if excel_path.stat().st_mtime > snapshot_path.stat().st_mtime:
+        return True
+    return snapshot_source_sha256(snapshot_path) != file_sha256(excel_path)
+
+def snapshot_source_sha256(snapshot_path: Path = SNAPSHOT_FILE) -> Optional[str]:
+    """Excel hash recorded in the snapshot schema (None for snapshots written before it was)."""
+    try:
+        with pa.memory_map(str(snapshot_path), "r") as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    value = metadata.get(SOURCE_SHA256_KEY)
+    return value.decode() if value else None
+
+def load_snapshot(
+    excel_path: Path = EXCEL_FILE,
+    snapshot_path: Path = SNAPSHOT_FILE,
+    memory_map: bool = False,
+) -> Snapshot:
+    """Read the snapshot, re-ingesting from Excel first if it is missing or stale."""
+    if snapshot_is_stale(excel_path, snapshot_path):
+        with ingest_lock(snapshot_path):
+            # Another worker may have ingested while we waited for the lock
+            if snapshot_is_stale(excel_path, snapshot_path):
+                ingest_excel(excel_path, snapshot_path)
+    logger.info(f"Loading snapshot from {snapshot_path} (memory_map={memory_map})")
+    return read_snapshot(snapshot_path, memory_map=memory_map)
+
+if __name__ == "__main__":
+    # Usage: python -m app.services.snapshot
+    with ingest_lock():
+        ingest_excel()
@@ -0,0 +1,99 @@
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from app.core.config import EXCEL_FILE, ANALYTICS_EXCEL_FILE, FILE_WATCH_INTERVAL_SECONDS
+from app.core.logger import logger
+
+@dataclass
+class FileFingerprint:
+    """mtime/size checked every poll; content hash only computed when they move."""
+    mtime_ns: int
+    size: int
+    sha256: str
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Content hash of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def fingerprint(path: Path, previous: Optional[FileFingerprint] = None) -> Optional[FileFingerprint]:
+    """Fingerprint a file, reusing the previous hash when mtime and size are unchanged."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    if previous and previous.mtime_ns == st.st_mtime_ns and previous.size == st.st_size:
+        return previous
+    return FileFingerprint(st.st_mtime_ns, st.st_size, file_sha256(path))
+
+class FileWatcher:
+    """
+    Polls watched files and runs their reload callback only when the content
+    changes. A touch (new mtime, same bytes) updates the fingerprint but does
+    not reload.
+    """
+
+    def __init__(self, interval: float = FILE_WATCH_INTERVAL_SECONDS):
+        self.interval = interval
+        self._callbacks: Dict[Path, Callable[[], object]] = {}
+        self._fingerprints: Dict[Path, Optional[FileFingerprint]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, path: Path, on_change: Callable[[], object]):
+        """Register a file; current content is the baseline."""
+        self._callbacks[path] = on_change
+        self._fingerprints[path] = fingerprint(path)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"File watcher started: {[str(p) for p in self._callbacks]}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def check(self):
+        """Single poll over all watched files."""
+        for path, on_change in self._callbacks.items():
+            previous = self._fingerprints.get(path)
+            current = fingerprint(path, previous)
+            self._fingerprints[path] = current
+
+            if current is None or current is previous:
+                continue
+            if previous is not None and current.sha256 == previous.sha256:
+                continue
+
+            logger.info(f"Change detected in {path}, reloading")
+            try:
+                on_change()
+            except Exception as e:
+                # Keep the old fingerprint so the next poll retries (e.g. file mid-write)
+                self._fingerprints[path] = previous
+                logger.error(f"Reload after change in {path} failed: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+def build_watcher() -> FileWatcher:
+    """Watcher for the card sheet and the analytics workbook."""
+    from app.services.data_loader import reload_from_source
+    from app.services.analytics import reload_analytics
+
+    watcher = FileWatcher()
+    watcher.watch(EXCEL_FILE, reload_from_source)
+    watcher.watch(ANALYTICS_EXCEL_FILE, reload_analytics)
+    return watcher
@@ -1,3 +1,5 @@
+import ast
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Tuple
 from app.core.config import (
@@ -39,18 +41,26 @@ def get_delivery_strength(delivery_days: int) -> float:
         return 0.3
     return 0.1
 
+def parse_extra_items(extra_value) -> Tuple[List[str], bool]:
+    """
+    Parse one 'extra' value (string repr of a list) → (items, ok).
+    Missing values are an empty list, not a failure.
+    """
+    if isinstance(extra_value, (list, tuple)):
+        return [str(item) for item in extra_value], True
+    if extra_value is None or (isinstance(extra_value, float) and np.isnan(extra_value)):
+        return [], True
+    try:
+        parsed = ast.literal_eval(str(extra_value))
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        return [], False
+    if not isinstance(parsed, (list, tuple)):
+        return [], False
+    return [str(item) for item in parsed], True
+
 def parse_extra_column(extra_str: str) -> List[str]:
     """Parse 'extra' column (stored as string repr of list)."""
-    try:
-        if pd.isna(extra_str):
-            return []
-        if isinstance(extra_str, list):
-            return extra_str
-        # Try eval if it's a string representation
-        import ast
-        return ast.literal_eval(str(extra_str))
-    except Exception:
-        return []
+    return parse_extra_items(extra_str)[0]
 
 def round_to_decimals(value: float, decimals: int = 2) -> float:
     """Round to N decimals."""
@@ -85,6 +95,32 @@ def get_rank_presence_score(rank: int) -> int:
         return 4
     return 0
 
+# Vectorized lookup tables, built from the scalar rules above so they cannot drift.
+# Ranks clip to [0, MAX_RANK + 1]; delivery days clip to [-1, weak upper bound + 1].
+RANK_PRESENCE_LUT = np.array(
+    [get_rank_presence_score(r) for r in range(0, MAX_RANK + 2)], dtype=np.float64
+)
+_DELIVERY_LUT_MAX = DELIVERY_THRESHOLDS["weak"][1] + 1
+DELIVERY_STRENGTH_LUT = np.array(
+    [get_delivery_strength(d) for d in range(-1, _DELIVERY_LUT_MAX + 1)], dtype=np.float64
+)
+
+def rank_presence_scores(ranks) -> np.ndarray:
+    """Vectorized get_rank_presence_score over an array of ranks."""
+    return RANK_PRESENCE_LUT[np.clip(np.asarray(ranks), 0, MAX_RANK + 1)]
+
+def delivery_strength_scores(delivery_days) -> np.ndarray:
+    """Vectorized get_delivery_strength over an array of delivery days."""
+    return DELIVERY_STRENGTH_LUT[np.clip(np.asarray(delivery_days), -1, _DELIVERY_LUT_MAX) + 1]
+
+def nrs_scores(ranks, max_ranks_in_prompt) -> np.ndarray:
+    """Vectorized calculate_nrs (rank and per-row prompt max rank arrays)."""
+    ranks = np.asarray(ranks, dtype=np.float64)
+    max_ranks = np.asarray(max_ranks_in_prompt, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        nrs = np.round((max_ranks + 1 - ranks) / max_ranks * 10, 2)
+    return np.where((ranks >= 1) & (ranks <= max_ranks), nrs, 0.0)
+
 def calculate_percentile(value: float, values: List[float]) -> Optional[float]:
     """Calculate percentile rank (0-100)."""
     valid = [v for v in values if is_valid_price(v)]
@@ -0,0 +1,24 @@
+import base64
+import binascii
+
+def encode_cursor(offset: int, generation: int) -> str:
+    """Opaque page cursor: row offset into the filtered cards, tied to a snapshot generation."""
+    return base64.urlsafe_b64encode(f"{generation}:{offset}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, generation: int) -> int:
+    """
+    Row offset from a cursor. Raises ValueError if the cursor is malformed or
+    was issued for another snapshot generation (offsets no longer line up).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_generation, offset = base64.urlsafe_b64decode(padded).decode().split(":")
+        cursor_generation, offset = int(cursor_generation), int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+    if offset < 0:
+        raise ValueError("Invalid cursor")
+    if cursor_generation != generation:
+        raise ValueError("Cursor expired: data was reloaded, restart from the first page")
+    return offset
@@ -0,0 +1,25 @@
+import json
+from typing import Any, Dict
+from fastapi.encoders import jsonable_encoder
+
+JSON_MEDIA_TYPE = "application/json"
+
+def json_bytes(value: Any) -> bytes:
+    """Encode a value the way FastAPI's JSONResponse does (compact, UTF-8)."""
+    return json.dumps(
+        jsonable_encoder(value),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+def json_object_bytes(fields: Dict[str, Any]) -> bytes:
+    """
+    JSON object from fields in order. Values that are already bytes are
+    spliced in as pre-encoded JSON; everything else goes through json_bytes.
+    """
+    parts = [
+        json_bytes(key) + b":" + (value if isinstance(value, bytes) else json_bytes(value))
+        for key, value in fields.items()
+    ]
+    return b"{" + b",".join(parts) + b"}"
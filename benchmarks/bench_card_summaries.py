@@ -0,0 +1,35 @@
+"""
+Parity check + benchmark: explore cards serialized column-wise to JSON bytes
+vs the previous iterrows → dict → CardSummary → JSONResponse path.
+
+Usage: python -m benchmarks.bench_card_summaries
+"""
+import json
+import time
+from app.services.analysis import generate_card_summaries, serialize_card_summaries
+from benchmarks.common import best_of, load_sheet, scale
+from benchmarks.legacy import generate_card_summaries_legacy, legacy_response_bytes
+
+
+def main():
+    sheet = load_sheet()
+    legacy = generate_card_summaries_legacy(sheet)
+    assert generate_card_summaries(sheet) == legacy
+    assert json.loads(serialize_card_summaries(sheet)) == json.loads(legacy_response_bytes(sheet))
+    print(f"parity ok: sheet ({len(legacy)} cards)")
+
+    print(f"\n{'rows':>8} {'legacy ms':>10} {'columnar ms':>12} {'speedup':>8}")
+    for factor in (10, 100, 1000):
+        frame = scale(sheet, factor)
+        start = time.perf_counter()
+        legacy_response_bytes(frame)
+        legacy_s = time.perf_counter() - start
+        columnar_s = best_of(serialize_card_summaries, frame, repeat=5)
+        print(
+            f"{len(frame):>8} {legacy_s * 1000:>10.1f} {columnar_s * 1000:>12.2f} "
+            f"{legacy_s / columnar_s:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Parity check + benchmark: /dashboard/compare from the load-time CompareIndex
+(two lookups) vs the previous per-request product/source re-filtering.
+
+Usage: python -m benchmarks.bench_compare
+"""
+import time
+import pandas as pd
+from typing import Optional
+from app.services.compare_index import CompareIndex, build_comparison
+from benchmarks.common import load_sheet, scale
+from benchmarks.legacy import compare_legacy
+
+
+def compare_indexed(index: CompareIndex, product_name: str, source1: str, source2: Optional[str]) -> Optional[dict]:
+    """Same assembly as the route, without serialization."""
+    if not index.has_product(product_name):
+        return None
+    if source2 is None:
+        source2 = index.auto_source(product_name, exclude=source1) or "unknown"
+    return build_comparison(
+        product_name, source1, source2,
+        index.get(product_name, source1),
+        index.get(product_name, source2),
+    ).model_dump()
+
+
+def comparable(response: Optional[dict]) -> Optional[dict]:
+    if response is not None:
+        response["metadata"].pop("comparison_timestamp")
+    return response
+
+
+def cases(df: pd.DataFrame):
+    """Every product × source pair, auto-detected source2, unknown and mixed-case sources."""
+    sources = list(df['source_normalized'].unique()) + ["unknown"]
+    for product in list(df['product_name'].unique()) + ["missing product"]:
+        for source1 in ["amazon", "Amazon"] + sources[:10]:
+            for source2 in [None, "AMAZON"] + sources:
+                yield product, source1, source2
+
+
+def main():
+    # The legacy body matched sources case-sensitively against lowercased
+    # input (stored "Flipkart" never matched); the index matches any case.
+    # They agree once the stored names are lowercase.
+    sheet = load_sheet()
+    sheet['source_normalized'] = sheet['source_normalized'].astype(str).str.lower()
+    index = CompareIndex(sheet)
+    checked = 0
+    for product, source1, source2 in cases(sheet):
+        legacy = comparable(compare_legacy(sheet, product, source1, source2))
+        indexed = comparable(compare_indexed(index, product, source1, source2))
+        assert legacy == indexed, (product, source1, source2, legacy, indexed)
+        checked += 1
+    print(f"parity ok: {checked} comparisons")
+
+    print(f"\n{'rows':>8} {'build ms':>9} {'legacy ms/call':>15} {'indexed ms/call':>16}")
+    for factor in (1, 100, 1000):
+        frame = scale(sheet, factor)
+        start = time.perf_counter()
+        frame_index = CompareIndex(frame)
+        build_s = time.perf_counter() - start
+        pairs = [(p, "amazon", None) for p in frame['product_name'].unique()]
+
+        start = time.perf_counter()
+        for args in pairs:
+            compare_legacy(frame, *args)
+        legacy_s = (time.perf_counter() - start) / len(pairs)
+
+        start = time.perf_counter()
+        for args in pairs:
+            compare_indexed(frame_index, *args)
+        indexed_s = (time.perf_counter() - start) / len(pairs)
+        print(f"{len(frame):>8} {build_s * 1000:>9.1f} {legacy_s * 1000:>15.3f} {indexed_s * 1000:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
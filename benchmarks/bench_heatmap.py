@@ -0,0 +1,63 @@
+"""
+Parity check + benchmark: grouped generate_heatmap_data vs the previous
+product × source nested mask loop, including a wide source dimension.
+
+Usage: python -m benchmarks.bench_heatmap
+"""
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+from app.services.analysis import generate_heatmap_data
+from app.services.metrics import calculate_nrs_per_row
+from benchmarks.common import best_of, load_sheet
+from benchmarks.legacy import generate_heatmap_data_legacy
+
+
+def assert_parity(legacy: List[Dict], grouped: List[Dict]):
+    """
+    Same cells, order and counts. avg_nrs may differ by one rounding step when a
+    mean lands on a .xx5 tie: groupby uses compensated summation, Series.mean
+    does not, so the last ulp can fall on either side.
+    """
+    assert len(legacy) == len(grouped)
+    for old, new in zip(legacy, grouped):
+        assert (old["product"], old["source"], old["card_count"]) == \
+            (new["product"], new["source"], new["card_count"]), (old, new)
+        assert abs(old["avg_nrs"] - new["avg_nrs"]) <= 0.01 + 1e-9, (old, new)
+
+
+def wide_frame(rows: int, products: int, sources: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic cards spread over many products and marketplaces."""
+    rng = np.random.default_rng(seed)
+    prompts = max(rows // 5, 1)
+    df = pd.DataFrame({
+        "prompt_id": [f"prompt-{i}" for i in rng.integers(0, prompts, rows)],
+        "product_name": [f"product-{i:04d}" for i in rng.integers(0, products, rows)],
+        "source_normalized": [f"source-{i:04d}" for i in rng.integers(0, sources, rows)],
+        "rank": rng.integers(1, 6, rows),
+    })
+    return calculate_nrs_per_row(df)
+
+
+def main():
+    sheet = calculate_nrs_per_row(load_sheet())
+    assert generate_heatmap_data_legacy(sheet) == generate_heatmap_data(sheet)
+    print(f"parity ok: sheet ({len(generate_heatmap_data(sheet))} cells)")
+
+    print(f"\n{'rows':>7} {'products':>8} {'sources':>8} {'legacy ms':>10} {'grouped ms':>10} {'speedup':>8}")
+    for rows, products, sources in [(5_000, 20, 10), (5_000, 20, 100), (5_000, 20, 400)]:
+        frame = wide_frame(rows, products, sources)
+        start = time.perf_counter()
+        legacy = generate_heatmap_data_legacy(frame)
+        legacy_s = time.perf_counter() - start
+        assert_parity(legacy, generate_heatmap_data(frame))
+        grouped_s = best_of(generate_heatmap_data, frame, repeat=5)
+        print(
+            f"{rows:>7} {products:>8} {sources:>8} {legacy_s * 1000:>10.1f} "
+            f"{grouped_s * 1000:>10.2f} {legacy_s / grouped_s:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
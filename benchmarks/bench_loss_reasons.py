@@ -0,0 +1,36 @@
+"""
+Parity check + benchmark: vectorized calculate_loss_reasons vs the previous
+per-prompt mask / iterrows implementation.
+
+Usage: python -m benchmarks.bench_loss_reasons
+"""
+from app.services.metrics import calculate_loss_reasons
+from benchmarks.common import best_of, drop_rank1_cards, load_sheet, scale
+from benchmarks.legacy import calculate_loss_reasons_legacy
+
+
+def main():
+    sheet = load_sheet()
+    perturbed = drop_rank1_cards(sheet)
+
+    # Parity on the real sheet and on a variant with losing prompts
+    for name, frame in [("sheet", sheet), ("sheet without some #1 cards", perturbed)]:
+        legacy = calculate_loss_reasons_legacy(frame)
+        vectorized = calculate_loss_reasons(frame)
+        assert legacy == vectorized, f"parity mismatch on {name}: {legacy} != {vectorized}"
+        print(f"parity ok: {name} -> {vectorized}")
+
+    print(f"\n{'scale':>6} {'rows':>8} {'legacy ms':>10} {'vector ms':>10} {'speedup':>8}")
+    for factor in (1, 10, 100):
+        frame = scale(perturbed, factor)
+        assert calculate_loss_reasons_legacy(frame) == calculate_loss_reasons(frame)
+        legacy_s = best_of(calculate_loss_reasons_legacy, frame, repeat=1 if factor == 100 else 3)
+        vector_s = best_of(calculate_loss_reasons, frame, repeat=5)
+        print(
+            f"{factor:>5}x {len(frame):>8} {legacy_s * 1000:>10.1f} "
+            f"{vector_s * 1000:>10.2f} {legacy_s / vector_s:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
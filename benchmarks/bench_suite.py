@@ -0,0 +1,252 @@
+"""
+Benchmark suite: load-time builds and the per-request work behind every
+dashboard endpoint, on synthetic card tables (benchmarks.synthetic) at
+10k, 1M and 10M rows. Results are written as JSON so runs on different
+commits can be compared (--baseline prints the change per operation).
+
+Sizes that would not fit in available memory are recorded as skipped.
+
+Usage:
+    python -m benchmarks.bench_suite
+    python -m benchmarks.bench_suite --sizes 10000,1000000 --baseline benchmarks/results/<earlier>.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from app.services.analysis import (
+    generate_heatmap_data, generate_product_performance, serialize_card_summaries,
+    iter_card_summaries_ndjson,
+)
+from app.services.compare_index import CompareIndex, build_comparison
+from app.services.filters import FilterIndex, apply_filters
+from app.services.home_summary import build_home_payload
+from app.services.metrics import (
+    add_derived_columns, calculate_global_metrics, calculate_loss_reasons,
+    calculate_source_breakdown, calculate_nrs_per_row,
+)
+from app.services.prompt_index import PromptIndex
+from app.services.snapshot import compact_columns
+from benchmarks.synthetic import generate_cards, pooled_extras
+
+DEFAULT_SIZES = [10_000, 1_000_000, 10_000_000]
+RESULTS_DIR = Path(__file__).parent / "results"
+# Peak bytes per row (frame + indexes + a filtered copy), measured at 1M rows with headroom
+ESTIMATED_BYTES_PER_ROW = 1_000
+# Lookups per timing sample for the per-call operations (compare, prompt detail)
+CALLS_PER_SAMPLE = 100
+
+
+def measure(fn: Callable[[], object], calls: int = 1, budget_s: float = 2.0, max_repeat: int = 20) -> Dict:
+    """Repeat fn until the time budget is spent (at least once); ms per call."""
+    timings = []
+    spent = 0.0
+    while not timings or (spent < budget_s and len(timings) < max_repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed * 1000 / calls)
+        spent += elapsed
+    return {
+        "min_ms": round(min(timings), 4),
+        "median_ms": round(statistics.median(timings), 4),
+        "repeat": len(timings),
+    }
+
+
+def available_memory_bytes() -> Optional[int]:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_AVPHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def run_size(rows: int, seed: int) -> Dict:
+    """Every operation at one table size."""
+    results: Dict[str, Dict] = {}
+    raw = generate_cards(rows, seed)
+
+    # Load time: what _load_into_cache / ingest do once per snapshot
+    start = time.perf_counter()
+    df = add_derived_columns(compact_columns(raw))
+    results["load.compact_and_derive"] = {"min_ms": round((time.perf_counter() - start) * 1000, 2), "repeat": 1}
+    del raw
+    extras = pooled_extras(df)
+
+    builds = {}
+    for name, build in [
+        ("load.filter_index", lambda: FilterIndex(df)),
+        ("load.prompt_index", lambda: PromptIndex(df, extras)),
+        ("load.compare_index", lambda: CompareIndex(df)),
+        ("load.home_payload", lambda: build_home_payload(df, datetime.now())),
+    ]:
+        start = time.perf_counter()
+        builds[name] = build()
+        results[name] = {"min_ms": round((time.perf_counter() - start) * 1000, 2), "repeat": 1}
+    filter_index = builds["load.filter_index"]
+    prompt_index = builds["load.prompt_index"]
+    compare_index = builds["load.compare_index"]
+
+    # Request time. A typical narrowed explore query: 3 products x top 2 sources
+    products = df['product_name'].cat.categories[:3].tolist()
+    sources = df['source_normalized'].value_counts().index[:2].tolist()
+    product, source = ",".join(products), ",".join(sources)
+    narrowed = apply_filters(df, product=product, source=source, index=filter_index)
+    narrowed_nrs = calculate_nrs_per_row(narrowed)
+
+    rng = np.random.default_rng(seed)
+    all_products = df['product_name'].cat.categories.tolist()
+    compare_products = [all_products[i] for i in rng.integers(0, len(all_products), CALLS_PER_SAMPLE)]
+    prompt_ids = df['prompt_id'].cat.categories.to_numpy()
+    lookup_prompts = prompt_ids[rng.integers(0, len(prompt_ids), CALLS_PER_SAMPLE)].tolist()
+
+    def compare_calls():
+        for name in compare_products:
+            source2 = compare_index.auto_source(name, exclude="amazon") or "unknown"
+            build_comparison(name, "amazon", source2, compare_index.get(name, "amazon"), compare_index.get(name, source2))
+
+    def compare_batch():
+        s1 = compare_index.get(compare_products[0], "amazon")
+        for source2 in compare_index.sources(compare_products[0]):
+            build_comparison(compare_products[0], "amazon", source2, s1, compare_index.get(compare_products[0], source2))
+
+    def prompt_lookups():
+        for prompt_id in lookup_prompts:
+            entry = prompt_index.get(prompt_id)
+            cards = prompt_index.cards(entry)
+            cards['card_id'].tolist(), cards['price'].tolist()
+            prompt_index.card_extras(entry)
+
+    operations = [
+        ("home.global_metrics", lambda: calculate_global_metrics(df, full_snapshot=True), 1),
+        ("home.loss_reasons", lambda: calculate_loss_reasons(df), 1),
+        ("home.source_breakdown", lambda: calculate_source_breakdown(df), 1),
+        ("explore.apply_filters[none]", lambda: apply_filters(df, index=filter_index), 1),
+        ("explore.apply_filters[product+source]", lambda: apply_filters(df, product=product, source=source, index=filter_index), 1),
+        ("explore.apply_filters[rank+price+delivery]", lambda: apply_filters(
+            df, rank_max=2, has_price=True, has_delivery=True, index=filter_index), 1),
+        ("explore.apply_filters[product+source, no index]", lambda: apply_filters(df, product=product, source=source), 1),
+        ("explore.nrs[product+source]", lambda: calculate_nrs_per_row(narrowed), 1),
+        ("explore.heatmap[product+source]", lambda: generate_heatmap_data(narrowed_nrs), 1),
+        ("explore.heatmap[all]", lambda: generate_heatmap_data(df), 1),
+        ("explore.product_performance[product+source]", lambda: generate_product_performance(narrowed_nrs), 1),
+        ("explore.cards_page[limit=100]", lambda: serialize_card_summaries(df.iloc[:100]), 1),
+        ("explore.cards_ndjson[product+source]", lambda: b"".join(iter_card_summaries_ndjson(narrowed)), 1),
+        ("compare.single", compare_calls, CALLS_PER_SAMPLE),
+        ("compare.batch", compare_batch, 1),
+        ("prompt.lookup", prompt_lookups, CALLS_PER_SAMPLE),
+    ]
+    for name, fn, calls in operations:
+        results[name] = measure(fn, calls=calls)
+
+    return {
+        "status": "ok",
+        "rows": len(df),
+        "prompts": len(prompt_ids),
+        "narrowed_rows": len(narrowed),
+        "bytes_per_row": round(df.memory_usage(deep=True).sum() / len(df), 1),
+        "operations": results,
+    }
+
+
+def git_revision() -> Dict:
+    root = Path(__file__).parent.parent
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=root, capture_output=True, text=True
+        ).stdout.strip())
+        return {"commit": commit, "dirty": dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def environment() -> Dict:
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "pyarrow": pa.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def print_comparison(current: Dict, baseline: Dict):
+    """Change in min time per operation vs an earlier results file."""
+    print(f"\nvs baseline {baseline['meta']['git'].get('commit')} ({baseline['meta']['timestamp']})")
+    print(f"{'rows':>9} {'operation':<48} {'base ms':>10} {'now ms':>10} {'change':>8}")
+    for size, result in current["results"].items():
+        base = baseline["results"].get(size, {})
+        if result["status"] != "ok" or base.get("status") != "ok":
+            continue
+        for name, timing in result["operations"].items():
+            before = base["operations"].get(name)
+            if not before:
+                continue
+            change = (timing["min_ms"] / before["min_ms"] - 1) * 100 if before["min_ms"] else 0.0
+            print(f"{size:>9} {name:<48} {before['min_ms']:>10.3f} {timing['min_ms']:>10.3f} {change:>+7.0f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Comma-separated row counts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Results JSON path (default: benchmarks/results/)")
+    parser.add_argument("--baseline", type=Path, help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    git = git_revision()
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git": git,
+            "seed": args.seed,
+            "environment": environment(),
+        },
+        "results": {},
+    }
+
+    for rows in sizes:
+        available = available_memory_bytes()
+        if available is not None and rows * ESTIMATED_BYTES_PER_ROW > available:
+            report["results"][str(rows)] = {
+                "status": "skipped",
+                "reason": f"needs ~{rows * ESTIMATED_BYTES_PER_ROW / 1e9:.1f} GB, {available / 1e9:.1f} GB available",
+            }
+            print(f"{rows:>9} rows: skipped ({report['results'][str(rows)]['reason']})")
+            continue
+
+        start = time.perf_counter()
+        result = run_size(rows, args.seed)
+        report["results"][str(rows)] = result
+        print(f"\n{rows:>9} rows ({result['prompts']} prompts, {result['bytes_per_row']:.0f} bytes/row) "
+              f"in {time.perf_counter() - start:.0f}s")
+        for name, timing in result["operations"].items():
+            print(f"  {name:<48} {timing['min_ms']:>12.3f} ms")
+
+    output = args.output or RESULTS_DIR / (
+        f"suite-{git['commit'] or 'nogit'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        print_comparison(report, json.loads(args.baseline.read_text()))
+
+
+if __name__ == "__main__":
+    main()
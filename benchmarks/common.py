@@ -0,0 +1,40 @@
+"""Shared inputs and timing for the benchmarks (and the parity tests)."""
+import time
+import numpy as np
+import pandas as pd
+from app.core.config import EXCEL_FILE
+from app.services.snapshot import clean_raw_data
+
+
+def load_sheet() -> pd.DataFrame:
+    """The card sheet after the ingest cleaning stage (no compaction or derived columns)."""
+    return clean_raw_data(pd.read_excel(EXCEL_FILE, sheet_name="Sheet1"))
+
+
+def drop_rank1_cards(df: pd.DataFrame, seed: int = 0) -> pd.DataFrame:
+    """Every prompt in the sheet has a #1 card; drop some so loss paths are exercised."""
+    rng = np.random.default_rng(seed)
+    prompts = df['prompt_id'].unique()
+    losing = set(rng.choice(prompts, size=len(prompts) // 2, replace=False))
+    keep = ~(df['prompt_id'].isin(losing) & (df['rank'] == 1))
+    return df[keep]
+
+
+def scale(df: pd.DataFrame, factor: int) -> pd.DataFrame:
+    """Replicate the sheet `factor` times with distinct prompt ids."""
+    copies = []
+    for i in range(factor):
+        part = df.copy()
+        part['prompt_id'] = part['prompt_id'] + f"-{i}"
+        copies.append(part)
+    return pd.concat(copies, ignore_index=True)
+
+
+def best_of(fn, df: pd.DataFrame, repeat: int) -> float:
+    """Fastest of `repeat` runs of fn(df), in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
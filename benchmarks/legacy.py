@@ -0,0 +1,226 @@
+"""
+Implementations replaced by the optimized code paths, kept unchanged as
+parity references for the benchmarks and tests (the optimized versions
+must return the same results).
+"""
+import json
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional
+from fastapi.encoders import jsonable_encoder
+from app.models.schemas import CardSummary, ComparisonMetric, ComparisonResponse, WinLoseChip
+from app.utils.helpers import is_valid_delivery, is_valid_price, round_to_decimals
+
+
+def calculate_loss_reasons_legacy(df: pd.DataFrame) -> List[Dict]:
+    """calculate_loss_reasons: boolean mask per prompt + iterrows over its cards."""
+
+    loss_categories = {
+        "higher_price": 0,
+        "slower_delivery": 0,
+        "missing_price": 0,
+        "missing_delivery": 0,
+        "lower_rank_naturally": 0,
+    }
+
+    for prompt_id in df['prompt_id'].unique():
+        group = df[df['prompt_id'] == prompt_id]
+        best_rank_row = group.loc[group['rank'].idxmin()]
+        best_rank = best_rank_row['rank']
+
+        if best_rank > 1:
+            for _, row in group.iterrows():
+                if row['rank'] < best_rank_row['rank']:
+                    if is_valid_price(row['price']) and is_valid_price(best_rank_row['price']):
+                        if row['price'] < best_rank_row['price']:
+                            loss_categories["higher_price"] += 1
+
+                    if is_valid_delivery(row['delivery_days']) and is_valid_delivery(best_rank_row['delivery_days']):
+                        if row['delivery_days'] < best_rank_row['delivery_days']:
+                            loss_categories["slower_delivery"] += 1
+
+                if not is_valid_price(row['price']):
+                    loss_categories["missing_price"] += 1
+                if not is_valid_delivery(row['delivery_days']):
+                    loss_categories["missing_delivery"] += 1
+
+    total = sum(loss_categories.values()) or 1
+
+    losses = [
+        {"reason": k.replace("_", " ").title(), "occurrences": v, "weight": round(v / total, 3)}
+        for k, v in sorted(loss_categories.items(), key=lambda x: x[1], reverse=True)
+        if v > 0
+    ]
+
+    return losses[:5]
+
+
+def generate_heatmap_data_legacy(df: pd.DataFrame) -> List[Dict]:
+    """generate_heatmap_data: one mask per product × source pair."""
+
+    heatmap = []
+    for product in sorted(df['product_name'].unique()):
+        for source in sorted(df['source_normalized'].unique()):
+            subset = df[(df['product_name'] == product) & (df['source_normalized'] == source)]
+
+            if len(subset) > 0:
+                avg_nrs = round(subset['nrs'].mean(), 2)
+                heatmap.append({
+                    "product": product,
+                    "source": source,
+                    "avg_nrs": avg_nrs,
+                    "card_count": len(subset),
+                })
+
+    return heatmap
+
+
+def generate_card_summaries_legacy(df: pd.DataFrame) -> List[Dict]:
+    """generate_card_summaries: iterrows → one dict per card."""
+
+    cards = []
+    for _, row in df.iterrows():
+        cards.append({
+            "card_id": row['card_id'],
+            "product_name": row['product_name'],
+            "rank": int(row['rank']),
+            "source": row['source_normalized'],
+            "price": float(row['price']) if row['price'] > 0 else None,
+            "currency": row['price_currency'] if row['price_currency'] != '-1' else None,
+            "delivery_days": int(row['delivery_days']) if row['delivery_days'] >= 0 else None,
+            "delivery_fee": float(row['delivery_fee']) if row['delivery_fee'] > 0 else None,
+        })
+
+    return cards
+
+
+def legacy_response_bytes(df: pd.DataFrame) -> bytes:
+    """Old route path: dicts → models → response_model encoding → JSON."""
+    cards = [CardSummary(**c) for c in generate_card_summaries_legacy(df)]
+    return json.dumps(
+        jsonable_encoder(cards), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def compare_legacy(df: pd.DataFrame, product_name: str, source1: str, source2: Optional[str]) -> Optional[dict]:
+    """/dashboard/compare route body: product/source re-filtered per request (None = 404)."""
+
+    # Filter for product
+    product_df = df[df['product_name'] == product_name]
+    
+    if len(product_df) == 0:
+        return None
+    
+    # Get source1 data
+    s1_data = product_df[product_df['source_normalized'] == source1.lower()]
+    
+    # Auto-detect source2 if not provided
+    if source2 is None:
+        available_sources = [s for s in product_df['source_normalized'].unique() 
+                            if s != source1.lower()]
+        source2 = available_sources[0] if available_sources else "unknown"
+    
+    s2_data = product_df[product_df['source_normalized'] == source2.lower()]
+    
+    # Calculate metrics
+    metrics = []
+    
+    # Avg Price
+    s1_price = s1_data[s1_data['price'] > 0]['price'].mean() if len(s1_data[s1_data['price'] > 0]) > 0 else None
+    s2_price = s2_data[s2_data['price'] > 0]['price'].mean() if len(s2_data[s2_data['price'] > 0]) > 0 else None
+    
+    if s1_price and s2_price:
+        gap = s2_price - s1_price
+        gap_pct = round_to_decimals((gap / s1_price) * 100)
+        winner = "source1" if s1_price < s2_price else ("source2" if s2_price < s1_price else "tie")
+        metrics.append(ComparisonMetric(
+            metric="Average Price",
+            source1_value=round_to_decimals(s1_price),
+            source2_value=round_to_decimals(s2_price),
+            gap=round_to_decimals(gap),
+            gap_pct=gap_pct,
+            winner=winner,
+        ))
+    
+    # Avg Rank
+    s1_rank = s1_data['rank'].mean() if len(s1_data) > 0 else 999
+    s2_rank = s2_data['rank'].mean() if len(s2_data) > 0 else 999
+    gap = s2_rank - s1_rank
+    winner = "source1" if s1_rank < s2_rank else ("source2" if s2_rank < s1_rank else "tie")
+    metrics.append(ComparisonMetric(
+        metric="Average Rank",
+        source1_value=round_to_decimals(s1_rank),
+        source2_value=round_to_decimals(s2_rank),
+        gap=round_to_decimals(gap),
+        gap_pct=0.0,
+        winner=winner,
+    ))
+    
+    # Avg Delivery Days
+    s1_delivery = s1_data[s1_data['delivery_days'] >= 0]['delivery_days'].mean() if len(s1_data[s1_data['delivery_days'] >= 0]) > 0 else None
+    s2_delivery = s2_data[s2_data['delivery_days'] >= 0]['delivery_days'].mean() if len(s2_data[s2_data['delivery_days'] >= 0]) > 0 else None
+    
+    if s1_delivery and s2_delivery:
+        gap = s2_delivery - s1_delivery
+        winner = "source1" if s1_delivery < s2_delivery else ("source2" if s2_delivery < s1_delivery else "tie")
+        metrics.append(ComparisonMetric(
+            metric="Average Delivery Days",
+            source1_value=round_to_decimals(s1_delivery),
+            source2_value=round_to_decimals(s2_delivery),
+            gap=round_to_decimals(gap),
+            gap_pct=0.0,
+            winner=winner,
+        ))
+    
+    # Card Frequency
+    s1_freq = len(s1_data)
+    s2_freq = len(s2_data)
+    winner = "source1" if s1_freq > s2_freq else ("source2" if s2_freq > s1_freq else "tie")
+    metrics.append(ComparisonMetric(
+        metric="Appearances",
+        source1_value=float(s1_freq),
+        source2_value=float(s2_freq),
+        gap=float(s2_freq - s1_freq),
+        gap_pct=0.0,
+        winner=winner,
+    ))
+    
+    # Win/Lose Chips
+    chips = []
+    for metric in metrics:
+        if metric.winner == "source1":
+            if metric.metric == "Average Price":
+                value = f"-{abs(metric.gap_pct):.0f}%"
+                factor = "Better Price"
+            elif metric.metric == "Average Rank":
+                value = f"{abs(metric.gap):.1f} positions"
+                factor = "Better Rank"
+            elif metric.metric == "Average Delivery Days":
+                value = f"-{abs(metric.gap):.0f} days"
+                factor = "Faster Delivery"
+            else:
+                value = f"+{abs(metric.gap):.0f}"
+                factor = "More Appearances"
+            
+            chips.append(WinLoseChip(
+                factor=factor,
+                status="win",
+                value=value,
+                contribution=0.5,
+            ))
+    
+    # Metadata
+    metadata = {
+        "comparison_timestamp": datetime.now().isoformat(),
+        "s1_cards": len(s1_data),
+        "s2_cards": len(s2_data),
+    }
+    
+    return ComparisonResponse(
+        product_name=product_name,
+        source1=source1,
+        source2=source2,
+        metrics=metrics,
+        win_lose_chips=chips,
+        metadata=metadata,
+    ).model_dump()
@@ -0,0 +1,248 @@
+"""
+HTTP load test: drives the full main:app stack (logging middleware, GZip,
+response validation, response cache, compute pool) with a weighted mix of
+dashboard requests from N concurrent clients, and reports p50/p95/p99
+latency, throughput and error rate per route.
+
+Targets:
+    (default)      in-process over ASGI (httpx.ASGITransport; client and app share one event loop)
+    --uvicorn      in-process uvicorn server on a free local port (real sockets)
+    --url URL      an already running server, e.g. `uvicorn main:app --workers 4`
+
+Request parameters (products, sources, prompt ids) are sampled from the
+local data/sheet.xlsx, so --url should point at a server with the same sheet.
+Configuration such as RESPONSE_CACHE_ENABLED=False comes from the environment
+as usual.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 16 --duration 20
+    python -m benchmarks.load_test --mix home=1,explore=4 --uvicorn --output /tmp/load.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import socket
+import threading
+import time
+import urllib.parse
+import httpx
+import numpy as np
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from app.core.logger import console_handler
+from app.services.data_loader import get_data
+from main import app
+
+DEFAULT_MIX = "home=4,explore=3,compare=2,prompt=3,analytics=1"
+EXPLORE_SOURCES = [None, "amazon", "flipkart", "amazon,flipkart"]
+
+
+def route_samplers(rng: random.Random) -> Dict[str, Callable[[], str]]:
+    """Route name → function producing a request path with sampled parameters."""
+    df = get_data()
+    products = sorted(df['product_name'].unique().tolist())
+    prompt_ids = df['prompt_id'].unique().tolist()
+
+    def explore() -> str:
+        params = {}
+        if rng.random() < 0.5:
+            params["product"] = rng.choice(products)
+        source = rng.choice(EXPLORE_SOURCES)
+        if source:
+            params["source"] = source
+        rank_min = rng.randint(1, 5)
+        params.update(rank_min=rank_min, rank_max=rng.randint(rank_min, 5))
+        if rng.random() < 0.3:
+            params["has_price"] = "true"
+        return "/api/dashboard/explore?" + urllib.parse.urlencode(params)
+
+    return {
+        "home": lambda: "/api/dashboard/home",
+        "explore": explore,
+        "compare": lambda: "/api/dashboard/compare?" + urllib.parse.urlencode({"product_name": rng.choice(products)}),
+        "prompt": lambda: f"/api/prompt/{rng.choice(prompt_ids)}",
+        "analytics": lambda: "/api/dashboard/analytics",
+    }
+
+
+def parse_mix(mix: str, routes: List[str]) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in routes:
+            raise SystemExit(f"Unknown route '{name}' in --mix (choose from {', '.join(routes)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+class Recorder:
+    """Per-route latencies (ms) and status counts; status 0 = transport error."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, route: str, status: int, elapsed_ms: float):
+        self.latencies[route].append(elapsed_ms)
+        self.statuses[route][status] += 1
+
+    def summary(self, elapsed_s: float) -> Dict[str, Dict]:
+        report = {}
+        for route in sorted(self.latencies):
+            report[route] = self._route_summary(self.latencies[route], self.statuses[route], elapsed_s)
+        everything = [ms for values in self.latencies.values() for ms in values]
+        statuses = sum(self.statuses.values(), Counter())
+        if everything:
+            report["total"] = self._route_summary(everything, statuses, elapsed_s)
+        return report
+
+    @staticmethod
+    def _route_summary(latencies: List[float], statuses: Counter, elapsed_s: float) -> Dict:
+        values = np.array(latencies)
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        errors = sum(count for status, count in statuses.items() if status == 0 or status >= 400)
+        return {
+            "requests": len(values),
+            "throughput_rps": round(len(values) / elapsed_s, 1),
+            "p50_ms": round(p50, 2),
+            "p95_ms": round(p95, 2),
+            "p99_ms": round(p99, 2),
+            "max_ms": round(values.max(), 2),
+            "error_rate": round(errors / len(values), 4),
+            "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        }
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    samplers: Dict[str, Callable[[], str]],
+    weights: Dict[str, float],
+    concurrency: int,
+    duration: float,
+    rng: random.Random,
+    recorder: Optional[Recorder],
+) -> float:
+    """Closed loop: each worker sends its next request when the previous one returns."""
+    names = list(weights)
+    route_weights = [weights[name] for name in names]
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            route = rng.choices(names, route_weights)[0]
+            path = samplers[route]()
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            if recorder is not None:
+                recorder.record(route, status, (time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_uvicorn():
+    """uvicorn serving main:app in a background thread; returns (server, base_url)."""
+    import uvicorn
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise SystemExit("uvicorn failed to start")
+        time.sleep(0.05)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+async def main_async(args) -> Dict:
+    rng = random.Random(args.seed)
+    samplers = route_samplers(rng)
+    weights = parse_mix(args.mix, list(samplers))
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    server = thread = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits)
+        target = args.url
+    elif args.uvicorn:
+        server, thread, base_url = start_uvicorn()
+        client = httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits)
+        target = f"uvicorn {base_url}"
+    else:
+        # ASGITransport does not run lifespan events; run startup/shutdown here
+        await app.router.startup()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=args.timeout)
+        target = "asgi"
+
+    try:
+        async with client:
+            if args.warmup > 0:
+                await run_load(client, samplers, weights, args.concurrency, args.warmup, rng, None)
+            recorder = Recorder()
+            elapsed = await run_load(client, samplers, weights, args.concurrency, args.duration, rng, recorder)
+    finally:
+        if server is not None:
+            server.should_exit = True
+            thread.join()
+        elif not args.url:
+            await app.router.shutdown()
+
+    return {
+        "target": target,
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 2),
+        "mix": weights,
+        "routes": recorder.summary(elapsed),
+    }
+
+
+def print_report(report: Dict):
+    print(f"\n{report['target']} | concurrency {report['concurrency']} | {report['duration_s']}s")
+    print(f"{'route':<10} {'requests':>9} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    for route, stats in report["routes"].items():
+        print(
+            f"{route:<10} {stats['requests']:>9} {stats['throughput_rps']:>8.1f} {stats['p50_ms']:>9.2f} "
+            f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['max_ms']:>9.2f} {stats['error_rate']:>7.2%}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds first (fills caches)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"route=weight list (default {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout (s)")
+    parser.add_argument("--uvicorn", action="store_true", help="Serve through an in-process uvicorn server")
+    parser.add_argument("--url", help="Base URL of a running server")
+    parser.add_argument("--output", type=Path, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    # Requests are still logged to logs/app.log; only the console copy is muted
+    console_handler.setLevel(logging.WARNING)
+
+    report = asyncio.run(main_async(args))
+    print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
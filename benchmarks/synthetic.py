@@ -0,0 +1,133 @@
+"""
+Synthetic card tables with the cleaned sheet schema (what ingest_excel
+writes), for benchmarking at sizes the real sheet does not reach.
+
+Deterministic for a given (rows, seed). Strings that repeat in real data
+(products, sources, currencies, extra lists, prompt text) are drawn from
+pools, so memory stays close to what a real snapshot of that size needs;
+card_id and prompt_id are unique like the real UUIDs.
+
+Usage: python -m benchmarks.synthetic 1000000
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+from app.core.config import INVALID_CURRENCY
+from app.services.metrics import add_derived_columns
+from app.services.snapshot import EXTRA_ERROR_COLUMN, ExtraStore, Snapshot, compact_columns
+from app.utils.helpers import parse_extra_items
+
+# Marketplaces as they appear in the sheet (mixed case), then a long tail
+NAMED_SOURCES = [
+    "amazon", "Flipkart", "Croma", "Reliance Digital", "Vijay Sales", "Tata CLiQ",
+    "JioMart", "Gadgets 360", "V-Guard", "Myntra", "Snapdeal", "Paytm Mall",
+]
+
+EXTRA_VALUES = [
+    "['Free delivery', 'In stock']",
+    "['Bank offer', 'No cost EMI', 'Free delivery']",
+    "['Limited stock']",
+    "['Exchange offer', 'In stock', '1 year warranty', 'Free installation']",
+    "[]",
+    "not a list",  # Unparseable, as some sheet rows are
+    None,
+]
+
+
+def _string_pool(prefix: str, count: int) -> np.ndarray:
+    return np.char.add(prefix, np.arange(count).astype(str)).astype(object)
+
+
+def generate_cards(rows: int, seed: int = 0, products: int = 200, sources: int = 40) -> pd.DataFrame:
+    """Cleaned card table: prompts with 1-5 consecutive ranks, skewed source mix."""
+    rng = np.random.default_rng(seed)
+
+    # Prompts: 1-5 cards each, ranks 1..k
+    cards_per_prompt = rng.integers(1, 6, rows // 2 + 2)
+    cards_per_prompt = cards_per_prompt[:np.searchsorted(np.cumsum(cards_per_prompt), rows) + 1]
+    n_prompts = len(cards_per_prompt)
+    prompt_of_row = np.repeat(np.arange(n_prompts), cards_per_prompt)[:rows]
+    starts = np.r_[0, np.cumsum(cards_per_prompt)[:-1]]
+    rank = (np.arange(rows) - starts[prompt_of_row] + 1).astype(np.int64)
+
+    # Product per prompt; sources Zipf-like (a few marketplaces dominate)
+    product_names = _string_pool("Product ", products)
+    product_of_row = rng.integers(0, products, n_prompts)[prompt_of_row]
+    source_names = np.array(
+        NAMED_SOURCES[:sources] + [f"source-{i}" for i in range(max(sources - len(NAMED_SOURCES), 0))],
+        dtype=object,
+    )
+    weights = 1.0 / np.arange(1, len(source_names) + 1)
+    source_of_row = rng.choice(len(source_names), rows, p=weights / weights.sum())
+
+    # Price / delivery with the sheet's -1 sentinels
+    has_price = rng.random(rows) < 0.7
+    price = np.where(has_price, np.round(rng.lognormal(8, 1, rows), 2), -1.0)
+    currency = np.where(has_price, np.where(rng.random(rows) < 0.95, "INR", "USD"), INVALID_CURRENCY).astype(object)
+    delivery_days = np.where(rng.random(rows) < 0.6, rng.integers(0, 8, rows), -1)
+    delivery_fee = np.where(rng.random(rows) < 0.4, np.round(rng.uniform(0, 99, rows), 2), -1.0)
+
+    extra_pool = np.array(EXTRA_VALUES, dtype=object)
+    extra = extra_pool[rng.integers(0, len(extra_pool), rows)]
+
+    prompt_ids = _string_pool("prompt-", n_prompts)
+    prompt_texts = np.char.add("Best value pick for ", product_names.astype(str)).astype(object)
+
+    return pd.DataFrame({
+        "prompts": prompt_texts[product_of_row],
+        "prompt_id": prompt_ids[prompt_of_row],
+        "product_name": product_names[product_of_row],
+        "rank": rank,
+        "source": source_names[source_of_row],
+        "price": price,
+        "price_currency": currency,
+        "delivery_fee": delivery_fee,
+        "delivery_days": delivery_days.astype(np.int64),
+        "extra": extra,
+        "source_normalized": source_names[source_of_row],
+        "card_id": _string_pool("card-", rows),
+    })
+
+
+def pooled_extras(df: pd.DataFrame) -> ExtraStore:
+    """
+    parse_extra equivalent for pooled `extra` strings: each distinct value is
+    parsed once, then rows are expanded with array ops (adds EXTRA_ERROR_COLUMN,
+    drops `extra`).
+    """
+    codes, values = pd.factorize(df.pop('extra'), use_na_sentinel=False)
+    parsed = [parse_extra_items(value) for value in values]
+    df[EXTRA_ERROR_COLUMN] = np.array([not ok for _, ok in parsed])[codes]
+
+    items = sorted({item for row_items, _ in parsed for item in row_items})
+    item_code = {item: i for i, item in enumerate(items)}
+    lengths = np.array([len(row_items) for row_items, _ in parsed], dtype=np.int64)
+    table = np.zeros((len(parsed), max(lengths.max(initial=0), 1)), dtype=np.int32)
+    for i, (row_items, _) in enumerate(parsed):
+        table[i, :len(row_items)] = [item_code[item] for item in row_items]
+
+    row_lengths = lengths[codes]
+    offsets = np.r_[0, np.cumsum(row_lengths)]
+    position = np.arange(offsets[-1]) - np.repeat(offsets[:-1], row_lengths)
+    return ExtraStore(offsets, table[np.repeat(codes, row_lengths), position], items)
+
+
+def synthetic_snapshot(rows: int, seed: int = 0) -> Snapshot:
+    """Generated cards through the ingest stages (compact → derived → extras)."""
+    df = compact_columns(generate_cards(rows, seed))
+    df = add_derived_columns(df)
+    extras = pooled_extras(df)
+    return Snapshot(df, 0, extras)
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    start = time.perf_counter()
+    snapshot = synthetic_snapshot(rows)
+    df = snapshot.df
+    print(
+        f"{len(df)} rows, {df['prompt_id'].nunique()} prompts, {df['source_normalized'].nunique()} sources "
+        f"in {time.perf_counter() - start:.1f}s | {df.memory_usage(deep=True).sum() / len(df):.0f} bytes/row"
+    )
+    print(df.head().to_string())
@@ -5,9 +5,17 @@ from fastapi.responses import JSONResponse
 from datetime import datetime
 import time
 
-from app.core.config import API_TITLE, API_VERSION, CORS_ORIGINS, DEBUG
+from app.core.config import (
+    API_TITLE, API_VERSION, CORS_ORIGINS, DEBUG, BACKGROUND_REFRESH, FILE_WATCH_ENABLED,
+    SERVER_TIMING_ENABLED, PROFILING_ENABLED, PROFILING_REQUESTED,
+)
 from app.core.logger import logger
+from app.core.profiling import profile_request
+from app.core.telemetry import (
+    record_request, requests_in_flight, server_timing_header, start_timings, stop_timings
+)
 from app.routes import router as api_router
+from app.routes.metrics import router as metrics_router
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -44,16 +52,26 @@ async def log_requests(request: Request, call_next):
         f"Client: {request.client.host if request.client else 'unknown'}"
     )
     
+    timings_token = start_timings() if SERVER_TIMING_ENABLED else None
+    requests_in_flight.inc()
     try:
         response = await call_next(request)
     except Exception as e:
         logger.error(f"[{request_id}] Unhandled exception: {e}")
+        record_request(request, 500, time.time() - start_time)
         return JSONResponse(
             status_code=500,
             content={"detail": "Internal server error"},
         )
+    finally:
+        requests_in_flight.dec()
+        if timings_token is not None:
+            server_timing = server_timing_header(time.time() - start_time)
+            stop_timings(timings_token)
     
     process_time = time.time() - start_time
+    # Histogram labelled by route template (scope["route"] is set once routing has run)
+    record_request(request, response.status_code, process_time)
     logger.info(
         f"[{request_id}] {request.method} {request.url.path} | "
         f"Status: {response.status_code} | Duration: {process_time:.2f}s"
@@ -61,9 +79,19 @@ async def log_requests(request: Request, call_next):
     
     response.headers["X-Process-Time"] = str(process_time)
     response.headers["X-Request-ID"] = request_id
+    if timings_token is not None:
+        response.headers["Server-Timing"] = server_timing
     
     return response
 
+# On-demand profiling (admin): X-Profile header → cProfile dump for that request
+if PROFILING_ENABLED:
+    @app.middleware("http")
+    async def profile_requests(request: Request, call_next):
+        return await profile_request(request, call_next)
+elif PROFILING_REQUESTED:
+    logger.warning("PROFILING_ENABLED is set but PROFILING_TOKEN is empty: profiling stays disabled")
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler."""
@@ -75,6 +103,7 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 # ============ INCLUDE API ROUTES ============
 app.include_router(api_router, prefix="/api")
+app.include_router(metrics_router)  # Prometheus scrape path: /metrics
 
 # ============ STARTUP/SHUTDOWN EVENTS ============
 
@@ -94,10 +123,31 @@ async def startup_event():
         logger.info("✓ Data loaded successfully on startup")
     except Exception as e:
         logger.error(f"✗ Failed to load data on startup: {e}")
+    
+    try:
+        from app.services.analytics import load_analytics
+        load_analytics()
+        logger.info("✓ Analytics loaded successfully on startup")
+    except Exception as e:
+        logger.error(f"✗ Failed to load analytics on startup: {e}")
+    
+    if FILE_WATCH_ENABLED:
+        from app.services.watcher import build_watcher
+        app.state.watcher = build_watcher()
+        app.state.watcher.start()
+    elif BACKGROUND_REFRESH:
+        from app.services.data_loader import refresher
+        refresher.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
+    from app.services.data_loader import refresher
+    from app.services.compute_pool import compute_pool
+    refresher.stop()
+    compute_pool.shutdown()
+    if getattr(app.state, "watcher", None):
+        app.state.watcher.stop()
     logger.info("AEO/GEO Dashboard API Shutting down...")
     logger.info(f"{'='*60}")
 
@@ -128,6 +178,7 @@ async def info():
             "compare": "/api/dashboard/compare",
             "prompt_detail": "/api/prompt/{prompt_id}",
             "health": "/api/health",
+            "metrics": "/metrics",
             "reload": "/api/reload",
         },
     }
@@ -0,0 +1,10 @@
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Runs the startup/shutdown events (initial load, refresher, watcher)
+    with TestClient(app) as test_client:
+        yield test_client
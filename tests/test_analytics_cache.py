@@ -0,0 +1,30 @@
+"""The analytics workbook is read once, however many cold requests arrive together."""
+import threading
+import time
+import pandas as pd
+from app.services import analytics
+
+
+def test_concurrent_cold_loads_read_once(monkeypatch):
+    read_excel = pd.read_excel
+    reads = []
+
+    def slow_read_excel(*args, **kwargs):
+        reads.append(threading.current_thread().name)
+        time.sleep(0.2)  # Long enough for every thread to arrive during the read
+        return read_excel(*args, **kwargs)
+
+    monkeypatch.setattr(pd, "read_excel", slow_read_excel)
+    analytics.analytics_cache.clear()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(analytics.load_analytics())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(reads) == 1
+    assert len(results) == 8 and all(r is analytics.analytics_cache for r in results)
+    assert analytics.analytics_cache.marketshare
+
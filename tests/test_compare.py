@@ -0,0 +1,45 @@
+"""Batch compare agrees with single compare, whatever the stored or requested source case."""
+import pytest
+from app.services.data_loader import get_compare_index
+
+COMPARE = "/api/dashboard/compare"
+
+
+def without_timestamp(comparison: dict) -> dict:
+    return {**comparison, "metadata": {k: v for k, v in comparison["metadata"].items() if k != "comparison_timestamp"}}
+
+
+def mixed_case_products(client):
+    client.get("/api/health")
+    index = get_compare_index()
+    products = [p for p in index.products if any(s != s.lower() for s in index.sources(p))]
+    assert products, "sheet should have products with mixed-case sources (e.g. Flipkart)"
+    return index, products
+
+
+@pytest.mark.parametrize("source1", ["amazon", "Flipkart", "FLIPKART"])
+def test_batch_matches_single_compare(client, source1):
+    index, products = mixed_case_products(client)
+    for product in products:
+        batch = client.get(f"{COMPARE}/batch", params={"product_name": product, "source1": source1}).json()
+        sources2 = [c["source2"] for c in batch["comparisons"]]
+
+        # source1 is never compared with itself, in any case
+        assert source1.lower() not in [s.lower() for s in sources2]
+        assert sources2 == [s for s in index.sources(product) if s.lower() != source1.lower()]
+
+        for comparison in batch["comparisons"]:
+            single = client.get(COMPARE, params={
+                "product_name": product, "source1": source1, "source2": comparison["source2"],
+            }).json()
+            assert without_timestamp(comparison) == without_timestamp(single)
+
+
+def test_mixed_case_source_gets_its_aggregates(client):
+    index, products = mixed_case_products(client)
+    product = products[0]
+    stored = next(s for s in index.sources(product) if s != s.lower())
+
+    for requested in (stored, stored.lower(), stored.upper()):
+        single = client.get(COMPARE, params={"product_name": product, "source2": requested}).json()
+        assert single["metadata"]["s2_cards"] == index.get(product, stored)["cards"] > 0
@@ -0,0 +1,42 @@
+"""Event-loop offloading: prebuilt bodies skip the compute pool, blocking work never runs on the loop."""
+from app.services.compute_pool import compute_pool
+from app.services.response_cache import response_cache
+
+
+def test_home_skips_the_compute_pool(client, monkeypatch):
+    # The payload is built at load: a saturated pool must not 503 it
+    response_cache.clear()
+    monkeypatch.setattr(compute_pool, "_acquire", lambda: False)
+
+    assert client.get("/api/dashboard/explore?source=nope").status_code == 503
+    response = client.get("/api/dashboard/home")
+    assert response.status_code == 200
+    assert client.get("/api/dashboard/home", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+
+def test_card_stream_filters_in_the_pool(client, monkeypatch):
+    streamed = client.get("/api/dashboard/explore/cards", params={"source": "amazon"})
+    assert streamed.status_code == 200
+    assert len(streamed.text.splitlines()) == client.get(
+        "/api/dashboard/explore", params={"source": "amazon"}
+    ).json()["metadata"]["rows_returned"]
+
+    monkeypatch.setattr(compute_pool, "_acquire", lambda: False)
+    assert client.get("/api/dashboard/explore/cards", params={"source": "amazon"}).status_code == 503
+
+
+def test_reload_runs_off_the_event_loop(client, monkeypatch):
+    import threading
+    from app.services import data_loader
+    reload_data = data_loader.reload_data
+    threads = []
+
+    def recording_reload():
+        threads.append(threading.current_thread())
+        return reload_data()
+
+    monkeypatch.setattr(data_loader, "reload_data", recording_reload)
+    loop_thread = client.portal.call(threading.current_thread)
+
+    assert client.post("/api/reload").status_code == 200
+    assert threads and threads[0] is not loop_thread
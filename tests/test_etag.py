@@ -0,0 +1,61 @@
+"""ETag revalidation on cached JSON responses."""
+import pytest
+from app.services.response_cache import etag_matches, make_etag
+
+ENDPOINTS = ["/api/dashboard/home", "/api/dashboard/explore?source=amazon", "/api/dashboard/explore?limit=5"]
+
+
+@pytest.mark.parametrize("url", ENDPOINTS)
+def test_matching_etag_gets_304(client, url):
+    first = client.get(url)
+    etag = first.headers["etag"]
+
+    revalidated = client.get(url, headers={"If-None-Match": etag})
+
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert revalidated.headers["cache-control"] == "no-cache"
+
+
+def test_changed_etag_gets_full_body(client):
+    url = ENDPOINTS[0]
+    first = client.get(url)
+
+    response = client.get(url, headers={"If-None-Match": 'W/"0000", "stale"'})
+
+    assert response.status_code == 200
+    assert response.content == first.content
+
+
+def test_etag_depends_on_the_body(client):
+    amazon = client.get("/api/dashboard/explore?source=amazon").headers["etag"]
+    flipkart = client.get("/api/dashboard/explore?source=flipkart").headers["etag"]
+    assert amazon != flipkart
+
+
+def test_gzip_and_identity_share_a_weak_etag(client):
+    url = ENDPOINTS[0]
+    identity = client.get(url, headers={"Accept-Encoding": "identity"})
+    gzipped = client.get(url, headers={"Accept-Encoding": "gzip"})
+
+    # The same tag covers both codings, so it must be weak
+    assert gzipped.headers.get("content-encoding") == "gzip"
+    assert identity.headers.get("content-encoding") is None
+    assert identity.headers["etag"] == gzipped.headers["etag"]
+    assert identity.headers["etag"].startswith('W/"')
+    assert identity.content == gzipped.content  # httpx decodes the gzip body
+
+    revalidated = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": identity.headers["etag"]})
+    assert revalidated.status_code == 304
+
+
+def test_etag_matches_compares_weakly():
+    etag = make_etag(b"{}")
+    opaque = etag[2:]
+    assert etag_matches(etag, etag)
+    assert etag_matches(opaque, etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('W/"other"', etag)
@@ -0,0 +1,72 @@
+"""Explore cursor pagination: pages cover the unpaginated cards; cursors expire on reload."""
+EXPLORE = "/api/dashboard/explore"
+
+
+def walk_pages(client, params):
+    cards, pages, cursor = [], [], None
+    while True:
+        response = client.get(EXPLORE, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        metadata = response.json()["metadata"]
+        cards += response.json()["cards"]
+        pages.append(metadata)
+        cursor = metadata["next_cursor"]
+        if cursor is None:
+            return cards, pages
+
+
+def test_pages_concatenate_to_all_cards(client):
+    full = client.get(EXPLORE).json()
+    cards, pages = walk_pages(client, {"limit": 7})
+
+    assert cards == full["cards"]
+    assert len(pages) == -(-len(full["cards"]) // 7)
+    assert [page["cards_returned"] for page in pages[:-1]] == [7] * (len(pages) - 1)
+    assert all(page["rows_returned"] == full["metadata"]["rows_returned"] for page in pages)
+
+
+def test_filtered_pages_keep_heatmap_for_all_rows(client):
+    params = {"source": "amazon", "has_price": "true"}
+    full = client.get(EXPLORE, params=params).json()
+    first = client.get(EXPLORE, params={**params, "limit": 3}).json()
+
+    assert first["cards"] == full["cards"][:3]
+    assert first["heatmap_data"] == full["heatmap_data"]
+    assert first["product_performance"] == full["product_performance"]
+
+
+def test_unpaginated_response_has_no_cursor(client):
+    metadata = client.get(EXPLORE).json()["metadata"]
+    assert "next_cursor" not in metadata and "cards_returned" not in metadata
+
+
+def test_malformed_cursor_is_rejected(client):
+    response = client.get(EXPLORE, params={"limit": 5, "cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_cursor_expires_after_reload(client):
+    cursor = client.get(EXPLORE, params={"limit": 5}).json()["metadata"]["next_cursor"]
+    assert client.get(EXPLORE, params={"limit": 5, "cursor": cursor}).status_code == 200
+
+    # Re-ingest bumps the snapshot generation: old offsets may no longer line up
+    assert client.post("/api/reload").status_code == 200
+    response = client.get(EXPLORE, params={"limit": 5, "cursor": cursor})
+
+    assert response.status_code == 400
+    assert "expired" in response.json()["detail"]
+    assert walk_pages(client, {"limit": 5})[0] == client.get(EXPLORE).json()["cards"]
+
+
+def test_render_is_cached_under_its_own_snapshot_version(client, monkeypatch):
+    # A reload landing after explore read the frame must not key the old body
+    # under the new version
+    from app.services import data_loader
+    from app.services.response_cache import response_cache
+    served = data_loader.get_served_data()
+    response_cache.clear()
+    monkeypatch.setattr(data_loader.cache, "version", served.version + 1)
+
+    assert client.get(EXPLORE, params={"source": "amazon"}).status_code == 200
+    assert {key[-1] for key in response_cache._entries} == {served.version}
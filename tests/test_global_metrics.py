@@ -0,0 +1,28 @@
+"""calculate_global_metrics on filtered frames: load-time flags only count for the full snapshot."""
+import pytest
+from app.services.data_loader import get_data
+from app.services.metrics import calculate_global_metrics
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    return get_data()
+
+
+def test_full_snapshot_reuses_flags(snapshot):
+    plain = snapshot.drop(columns=["is_cheapest"])
+    assert calculate_global_metrics(snapshot, full_snapshot=True) == calculate_global_metrics(plain)
+
+
+@pytest.mark.parametrize("mask", [
+    lambda df: df['source_normalized'] == "amazon",
+    lambda df: df['rank'] >= 2,
+])
+def test_filtered_frame_recomputes_cheapest(snapshot, mask):
+    filtered = snapshot[mask(snapshot)]
+    expected = calculate_global_metrics(filtered.drop(columns=["is_cheapest"]))
+
+    assert calculate_global_metrics(filtered) == expected
+    # The snapshot-wide flags compare against cards the filter removed
+    stale = calculate_global_metrics(filtered, full_snapshot=True)
+    assert stale["price_competitiveness_rate"] != expected["price_competitiveness_rate"]
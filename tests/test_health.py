@@ -0,0 +1,10 @@
+"""Health check: completeness ratios and the extra parse-failure count are reported separately."""
+
+
+def test_health_reports_parse_failures_as_a_count(client):
+    body = client.get("/api/health").json()
+
+    assert set(body["data_quality"]) == {"price_coverage", "delivery_coverage", "overall_completeness"}
+    assert all(0 <= ratio <= 1 for ratio in body["data_quality"].values())
+    assert isinstance(body["extra_parse_failures"], int)
+    assert 0 <= body["extra_parse_failures"] <= body["total_rows"]
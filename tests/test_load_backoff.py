@@ -0,0 +1,31 @@
+"""Failed loads back off exponentially (capped) and reset on success."""
+import time
+from app.core.config import LOAD_RETRY_BACKOFF_MAX_SECONDS, LOAD_RETRY_BACKOFF_SECONDS
+from app.services.data_loader import DataCache
+
+
+def test_delay_doubles_up_to_the_cap():
+    cache = DataCache()
+    assert cache.retry_delay() == 0.0
+
+    delays = []
+    for failures in range(1, 80):
+        cache.consecutive_failures = failures
+        delays.append(cache.retry_delay())
+
+    assert delays[:3] == [LOAD_RETRY_BACKOFF_SECONDS, 2 * LOAD_RETRY_BACKOFF_SECONDS, 4 * LOAD_RETRY_BACKOFF_SECONDS]
+    assert delays == sorted(delays)
+    assert delays[-1] == LOAD_RETRY_BACKOFF_MAX_SECONDS
+
+
+def test_retry_allowed_once_the_backoff_passed():
+    cache = DataCache()
+    assert cache.retry_allowed()
+
+    cache.consecutive_failures = 3
+    cache.last_failure_at = time.monotonic()
+    assert not cache.retry_allowed()
+    assert 0 < cache.seconds_until_retry() <= 4 * LOAD_RETRY_BACKOFF_SECONDS
+
+    cache.last_failure_at = time.monotonic() - cache.retry_delay()
+    assert cache.retry_allowed()
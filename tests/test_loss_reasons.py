@@ -0,0 +1,43 @@
+"""Parity: vectorized calculate_loss_reasons vs the previous per-prompt loop."""
+import pandas as pd
+import pytest
+from app.services.metrics import calculate_loss_reasons
+from benchmarks.common import drop_rank1_cards, load_sheet, scale
+from benchmarks.legacy import calculate_loss_reasons_legacy
+from benchmarks.synthetic import generate_cards
+
+
+@pytest.fixture(scope="module")
+def sheet() -> pd.DataFrame:
+    return load_sheet()
+
+
+def test_sheet_matches_legacy(sheet):
+    assert calculate_loss_reasons(sheet) == calculate_loss_reasons_legacy(sheet)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_prompts_without_rank1_match_legacy(sheet, seed):
+    # Every prompt in the sheet has a #1 card; without one the loss paths run
+    df = drop_rank1_cards(sheet, seed)
+    expected = calculate_loss_reasons_legacy(df)
+    assert expected, "fixture should produce losses"
+    assert calculate_loss_reasons(df) == expected
+
+
+def test_scaled_sheet_matches_legacy(sheet):
+    df = drop_rank1_cards(scale(sheet, 3))
+    assert calculate_loss_reasons(df) == calculate_loss_reasons_legacy(df)
+
+
+@pytest.mark.parametrize("seed", [0, 7])
+def test_synthetic_cards_match_legacy(seed):
+    # Sentinel prices/delivery days and 1-5 cards per prompt
+    df = generate_cards(2_000, seed)
+    df = df[df['rank'] != 1].reset_index(drop=True)
+    assert calculate_loss_reasons(df) == calculate_loss_reasons_legacy(df)
+
+
+def test_empty_frame_matches_legacy(sheet):
+    df = sheet.iloc[0:0]
+    assert calculate_loss_reasons(df) == calculate_loss_reasons_legacy(df)
@@ -0,0 +1,49 @@
+"""Profiling is admin-only: never on without a token, never from DEBUG."""
+import os
+import subprocess
+import sys
+import pytest
+from app.core import profiling
+
+
+def profiling_enabled(env: dict) -> bool:
+    base = {k: v for k, v in os.environ.items() if not k.startswith(("PROFILING_", "DEBUG"))}
+    result = subprocess.run(
+        [sys.executable, "-c", "from app.core.config import PROFILING_ENABLED; print(PROFILING_ENABLED)"],
+        env={**base, **env}, capture_output=True, text=True, check=True,
+    )
+    return result.stdout.strip() == "True"
+
+
+@pytest.mark.parametrize("env, enabled", [
+    ({}, False),
+    ({"DEBUG": "True"}, False),
+    ({"PROFILING_ENABLED": "True"}, False),
+    ({"PROFILING_ENABLED": "True", "PROFILING_TOKEN": ""}, False),
+    ({"PROFILING_TOKEN": "s3cret"}, False),
+    ({"PROFILING_ENABLED": "True", "PROFILING_TOKEN": "s3cret"}, True),
+])
+def test_profiling_needs_flag_and_token(env, enabled):
+    assert profiling_enabled(env) is enabled
+
+
+def test_authorized_requires_the_token(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", "s3cret")
+    assert profiling.authorized("s3cret")
+    assert not profiling.authorized("wrong")
+    assert not profiling.authorized("")
+    assert not profiling.authorized(None)
+    assert not profiling.authorized("sécret")
+
+    # A token that went missing must not open profiling to everyone
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", "")
+    assert not profiling.authorized("")
+    assert not profiling.authorized("anything")
+
+
+def test_disabled_profiling_hides_debug_routes(client):
+    assert client.get("/api/debug/profiles", headers={"X-Profile": "anything"}).status_code == 404
+    response = client.get("/api/dashboard/home", headers={"X-Profile": "anything"})
+    assert response.status_code == 200
+    assert "x-profile-file" not in response.headers